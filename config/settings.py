@@ -1,16 +1,19 @@
 import os
-from typing import List
-from pydantic_settings import BaseSettings
+from typing import List, Optional
+import msgspec
+from dotenv import dotenv_values
 
-class Settings(BaseSettings):
+class Settings(msgspec.Struct, kw_only=True):
     # API Configuration
     app_name: str = "Shopify Insights Fetcher"
     app_version: str = "1.0.0"
     debug: bool = False
     host: str = "0.0.0.0"
     port: int = 8000
+    workers: int = msgspec.field(default_factory=lambda: min(os.cpu_count() or 1, 4))
     
     # Database Configuration
+    enable_db_storage: bool = True  # false runs the API without MySQL; /stored-* endpoints return 503
     database_url: str = "mysql+pymysql://root:@localhost/shopify_fetcher_db"
     database_pool_size: int = 10
     database_max_overflow: int = 20
@@ -19,11 +22,14 @@ class Settings(BaseSettings):
     request_timeout: int = 30
     max_retries: int = 2
     rate_limit_delay: float = 1.0
-    user_agents: List[str] = [
+    max_concurrent_requests: int = 64
+    max_concurrent_requests_per_host: int = 8
+    max_concurrent_stores: int = 8  # stores scraped at once by /insights/batch
+    user_agents: List[str] = msgspec.field(default_factory=lambda: [
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    ]
+    ])
     
     # Selenium Configuration
     use_selenium: bool = False
@@ -33,13 +39,33 @@ class Settings(BaseSettings):
     # Cache Configuration
     cache_enabled: bool = True
     cache_ttl: int = 3600  # 1 hour
+    redis_url: Optional[str] = None  # e.g. redis://localhost:6379/0; in-process cache only when unset
+    
+    # Task Queue Configuration (Celery); /insights/async runs in-process when unset
+    broker_url: Optional[str] = None
+    result_backend: Optional[str] = None
     
     # Logging Configuration
     log_level: str = "INFO"
     log_file: str = "shopify_insights.log"
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    @classmethod
+    def from_env(cls, env_file: str = ".env") -> "Settings":
+        """Load settings from the .env file and the environment (case-insensitive, env wins)"""
+        field_names = set(cls.__struct_fields__)
+        values = {}
+        
+        for source in (dotenv_values(env_file), os.environ):
+            for key, value in source.items():
+                name = key.lower()
+                if name not in field_names or value is None:
+                    continue
+                # Complex values such as USER_AGENTS are given as JSON
+                if value.lstrip().startswith(('[', '{')):
+                    value = msgspec.json.decode(value)
+                values[name] = value
+        
+        # Lax mode converts the raw strings to int/float/bool fields
+        return msgspec.convert(values, cls, strict=False)
 
-settings = Settings()
\ No newline at end of file
+settings = Settings.from_env()
\ No newline at end of file
@@ -0,0 +1,93 @@
+import logging
+from typing import Any, Dict, Optional
+import orjson
+from cachetools import TTLCache
+from core.models import BrandInsights
+from core.utils import canonical_url
+from config.settings import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis is optional; the in-process tier works on its own
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+class InsightsCache:
+    """Two-tier cache for scraped insights: in-process TTL cache, then Redis if configured"""
+
+    def __init__(self, ttl: int, maxsize: int = 1024, redis_url: Optional[str] = None):
+        self.ttl = ttl
+        self._local: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._task_status: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._redis = None
+        if redis_url:
+            if aioredis is None:
+                logger.warning("REDIS_URL is set but the redis package is not installed")
+            else:
+                self._redis = aioredis.from_url(redis_url)
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return f"insights:{canonical_url(url)}"
+
+    async def get(self, url: str) -> Optional[BrandInsights]:
+        """Return cached insights for url, or None on a miss"""
+        key = self._key(url)
+        insights = self._local.get(key)
+        if insights is not None:
+            return insights
+
+        if self._redis is not None:
+            try:
+                cached = await self._redis.get(key)
+            except Exception as e:
+                logger.warning(f"Redis get failed for {key}: {e}")
+                return None
+            if cached:
+                insights = BrandInsights.model_validate_json(cached)
+                self._local[key] = insights
+                return insights
+        return None
+
+    async def set(self, url: str, insights: BrandInsights) -> None:
+        """Store insights for url in both tiers"""
+        key = self._key(url)
+        self._local[key] = insights
+        if self._redis is not None:
+            try:
+                await self._redis.set(key, insights.model_dump_json(), ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"Redis set failed for {key}: {e}")
+
+    @property
+    def shared(self) -> bool:
+        """True when entries are visible to every worker process, i.e. Redis is configured"""
+        return self._redis is not None
+    
+    async def set_task_status(self, task_id: str, status: Dict[str, Any]) -> None:
+        """Record the JSON-ready status of an in-process /insights/async task"""
+        self._task_status[task_id] = status
+        if self._redis is not None:
+            try:
+                await self._redis.set(f"task:{task_id}", orjson.dumps(status), ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"Redis set failed for task {task_id}: {e}")
+    
+    async def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return the recorded status of a task, which may have been started by another worker"""
+        status = self._task_status.get(task_id)
+        if status is not None or self._redis is None:
+            return status
+        try:
+            cached = await self._redis.get(f"task:{task_id}")
+        except Exception as e:
+            logger.warning(f"Redis get failed for task {task_id}: {e}")
+            return None
+        return orjson.loads(cached) if cached else None
+    
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.close()
+
+insights_cache = InsightsCache(ttl=settings.cache_ttl, redis_url=settings.redis_url)
@@ -1,9 +1,11 @@
-from pydantic import BaseModel, HttpUrl, Field
+from pydantic import BaseModel, ConfigDict, HttpUrl, Field, field_serializer
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import json
 
 class ProductModel(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     name: str
     price: Optional[str] = None
     original_price: Optional[str] = None
@@ -16,6 +18,8 @@ class ProductModel(BaseModel):
     tags: Optional[List[str]] = []
 
 class SocialHandles(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     instagram: Optional[str] = None
     facebook: Optional[str] = None
     twitter: Optional[str] = None
@@ -25,22 +29,30 @@ class SocialHandles(BaseModel):
     pinterest: Optional[str] = None
 
 class ContactDetails(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     emails: List[str] = []
     phone_numbers: List[str] = []
     address: Optional[str] = None
     contact_form_url: Optional[str] = None
 
 class PolicyModel(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     title: str
     content: str
     url: Optional[str] = None
 
 class FAQModel(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     question: str
     answer: str
     category: Optional[str] = "General"
 
 class ImportantLinks(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     order_tracking: Optional[str] = None
     contact_us: Optional[str] = None
     blogs: Optional[str] = None
@@ -50,60 +62,64 @@ class ImportantLinks(BaseModel):
     careers: Optional[str] = None
 
 class BrandInsights(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     website_url: str
     brand_name: Optional[str] = None
     brand_description: Optional[str] = None
     logo_url: Optional[str] = None
     hero_products: List[ProductModel] = []
     product_catalog: List[ProductModel] = []
-    social_handles: SocialHandles = SocialHandles()
-    contact_details: ContactDetails = ContactDetails()
+    social_handles: SocialHandles = Field(default_factory=SocialHandles)
+    contact_details: ContactDetails = Field(default_factory=ContactDetails)
     privacy_policy: Optional[PolicyModel] = None
     return_policy: Optional[PolicyModel] = None
     refund_policy: Optional[PolicyModel] = None
     terms_of_service: Optional[PolicyModel] = None
     faqs: List[FAQModel] = []
-    important_links: ImportantLinks = ImportantLinks()
+    important_links: ImportantLinks = Field(default_factory=ImportantLinks)
     currencies_supported: List[str] = []
     payment_methods: List[str] = []
     shipping_countries: List[str] = []
     total_products: int = 0
     scraped_at: datetime = Field(default_factory=datetime.now)
     
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    @field_serializer('scraped_at', when_used='json')
+    def serialize_scraped_at(self, value: datetime) -> str:
+        return value.isoformat()
     
 class ErrorResponse(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     error: str
     status_code: int
     message: str
     timestamp: datetime = Field(default_factory=datetime.now)
     
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    @field_serializer('timestamp', when_used='json')
+    def serialize_timestamp(self, value: datetime) -> str:
+        return value.isoformat()
 
 class SuccessResponse(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     success: bool = True
     data: BrandInsights
     message: str = "Successfully fetched brand insights"
     timestamp: datetime = Field(default_factory=datetime.now)
     
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    @field_serializer('timestamp', when_used='json')
+    def serialize_timestamp(self, value: datetime) -> str:
+        return value.isoformat()
 
 class CompetitorAnalysisResponse(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     success: bool = True
     data: Dict[str, Any]
     message: str = "Successfully completed competitor analysis"
     timestamp: datetime = Field(default_factory=datetime.now)
     
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
\ No newline at end of file
+    @field_serializer('timestamp', when_used='json')
+    def serialize_timestamp(self, value: datetime) -> str:
+        return value.isoformat()
\ No newline at end of file
@@ -0,0 +1,68 @@
+from typing import Any, Iterable, Iterator
+from decimal import Decimal
+from pathlib import Path
+from uuid import UUID
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import Url
+
+def orjson_default(obj: Any) -> Any:
+    """orjson fallback for the types it does not encode natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode='json')
+    if isinstance(obj, (Url, Path, UUID, Decimal)):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    orjson serializes datetimes, UUIDs and dataclasses natively, so payloads no
+    longer need a jsonable_encoder pass before being returned.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+def splice_json(obj: bytes, key: str, value: bytes) -> bytes:
+    """Append an already-encoded value to an encoded JSON object as obj[key].
+
+    Lets callers add a field to a Pydantic/orjson output without decoding it
+    back into a dict first.
+    """
+    if obj == b"{}":
+        return b'{' + orjson.dumps(key) + b':' + value + b'}'
+    return obj[:-1] + b',' + orjson.dumps(key) + b':' + value + b'}'
+
+def json_envelope(data: bytes, **fields: Any) -> bytes:
+    """Wrap already-encoded JSON data as {...fields, "data": data}"""
+    return splice_json(orjson.dumps(fields), "data", data)
+
+def iter_json_envelope(items: Iterable[Any], **fields: Any) -> Iterator[bytes]:
+    """Yield {...fields, "data": [items]} piece by piece, encoding one item at a time"""
+    head = orjson.dumps(fields)
+    yield b'{"data":[' if head == b"{}" else head[:-1] + b',"data":['
+    for index, item in enumerate(items):
+        yield (b',' if index else b'') + orjson.dumps(item, default=orjson_default)
+    yield b']}'
+
+def iter_splice_json_list(obj: bytes, key: str, items: Iterable[bytes]) -> Iterator[bytes]:
+    """Yield an encoded JSON object with a list of already-encoded items appended
+    as obj[key], one item at a time"""
+    yield (b'{' if obj == b"{}" else obj[:-1] + b',') + orjson.dumps(key) + b':['
+    for index, item in enumerate(items):
+        yield (b',' if index else b'') + item
+    yield b']}'
+
+def iter_json_envelope_chunks(chunks: Iterable[bytes], **fields: Any) -> Iterator[bytes]:
+    """Yield {...fields, "data": <chunks>} where chunks together form one JSON value"""
+    head = orjson.dumps(fields)
+    yield b'{"data":' if head == b"{}" else head[:-1] + b',"data":'
+    yield from chunks
+    yield b'}'
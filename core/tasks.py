@@ -0,0 +1,51 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+from config.settings import settings
+
+try:
+    from celery import Celery
+except ImportError:  # Celery is only needed when a broker is configured
+    Celery = None
+
+logger = logging.getLogger(__name__)
+
+# Queue the scrape tasks are routed to, so workers can be dedicated to scraping
+SCRAPE_QUEUE = "scrape"
+
+celery_app = None
+if settings.broker_url:
+    if Celery is None:
+        logger.warning("BROKER_URL is set but celery is not installed; /insights/async runs in-process")
+    else:
+        celery_app = Celery(
+            "insights",
+            broker=settings.broker_url,
+            backend=settings.result_backend or settings.broker_url
+        )
+        celery_app.conf.task_routes = {"insights.scrape": {"queue": SCRAPE_QUEUE}}
+
+# One event loop per worker process, so the shared aiohttp session, semaphores
+# and rate limiter keep working across tasks instead of being tied to a dead loop
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _run_in_worker_loop(coro) -> Any:
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+    return _worker_loop.run_until_complete(coro)
+
+if celery_app is not None:
+    @celery_app.task(name="insights.scrape")
+    def scrape_insights_task(website_url: str) -> Dict[str, Any]:
+        """Scrape a store on a worker node and return the insights as JSON-ready data
+
+        Run workers with: celery -A core.tasks.celery_app worker -Q scrape --concurrency=N
+        """
+        # Imported lazily: only worker processes ever execute this task
+        from modules.shopify_service import ShopifyInsightsService
+
+        insights = _run_in_worker_loop(ShopifyInsightsService().fetch_insights(website_url))
+        return insights.model_dump(mode='json')
+else:
+    scrape_insights_task = None
@@ -1,68 +1,246 @@
 import asyncio
 import aiohttp
-import requests
-from bs4 import BeautifulSoup
-from typing import Optional, Dict, Any, List
-from urllib.parse import urljoin, urlparse
+from bs4 import BeautifulSoup, SoupStrainer
+from typing import Optional, Dict, Any, List, Union
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from yarl import URL
 import re
+import random
+import time
+from functools import lru_cache
 import logging
 from fake_useragent import UserAgent
 from config.settings import settings
 import ssl
 import certifi
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax wheels are not published for every platform
+    LexborHTMLParser = None
+
+try:
+    import re2
+except ImportError:  # google-re2 is optional; _CONTACT_RE is written so both engines match alike
+    re2 = None
+
 logger = logging.getLogger(__name__)
 
+# Only <script> tags are kept when parsing with this strainer
+SCRIPT_STRAINER = SoupStrainer('script')
+
+# Precompiled patterns used on every scraped page
+_SHOPIFY_RE = re.compile(
+    r'Shopify\.theme|shopify\.com|cdn\.shopify\.com|Shopify\.shop|shopify-features|shopify-section|myshopify\.com',
+    re.IGNORECASE
+)
+_SHOPIFY_BYTES_RE = re.compile(_SHOPIFY_RE.pattern.encode(), re.IGNORECASE)
+_SHOPIFY_SHOP_RE = re.compile(r'Shopify\.shop\s*=\s*"([^"]+)"')
+_SHOPIFY_CURRENCY_RE = re.compile(r'Shopify\.currency\s*=\s*["\']([^"\']+)["\']')
+_WHITESPACE_RE = re.compile(r'\s+')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.\,\!\?\-\(\)]')
+_PRICE_RES = [re.compile(p, re.IGNORECASE) for p in [
+    r'[\$₹€£¥][\d,]+\.?\d*',
+    r'[\d,]+\.?\d*\s*[\$₹€£¥]',
+    r'[Rr][Ss]\.?\s*[\d,]+\.?\d*',
+    r'[Uu][Ss][Dd]\s*[\d,]+\.?\d*'
+]]
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+_PHONE_RES = [re.compile(p) for p in [
+    r'\+\d{1,3}[-.\s]?\d{3,4}[-.\s]?\d{3,4}[-.\s]?\d{3,4}',
+    r'\(\d{3}\)\s*\d{3}[-.\s]?\d{4}',
+    r'\d{3}[-.\s]?\d{3}[-.\s]?\d{4}',
+    r'\+\d{10,15}'
+]]
+# Emails, phones and prices fused into one alternation so a page is scanned once.
+# Compiled with re.ASCII and spelled out case-explicitly instead of IGNORECASE:
+# RE2's \b, \d and \s are ASCII-only and its case folding is Unicode-wide, so
+# this is the form in which both engines match exactly the same text.
+_CONTACT_RE = re.compile('|'.join(
+    [f'(?P<email>{_EMAIL_RE.pattern})']
+    + [f'(?P<phone{i}>{p.pattern})' for i, p in enumerate(_PHONE_RES)]
+    + [f'(?P<price{i}>{p.pattern})' for i, p in enumerate(_PRICE_RES)]
+), re.ASCII)
+# A store suffix forming the whole end of a product name, e.g. "Tee - Shop Now".
+# The separator must be spaced so hyphenated names ("Back-Online Hoodie") stay
+# whole, and nothing may follow so "Sweater | Official Licensed Red" does too.
+_PRODUCT_NAME_SUFFIX_RE = re.compile(r'\s+[-–|]\s+(shop|store|online|official)(\s+now)?\s*$')
+_CONTACT_KEYS = {'email': 'emails', 'phone': 'phone_numbers', 'price': 'prices'}
+# RE2 scans in linear time, so long runs of address-like text cannot make the
+# email pattern backtrack
+_CONTACT_SCANNER = re2.compile(_CONTACT_RE.pattern) if re2 is not None else _CONTACT_RE
+
+def parse_html(html: Union[str, bytes], parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Parse a page with lxml, the one soup constructor used across the scraper.
+    
+    Prefer passing the raw response bytes: lxml sniffs the encoding itself and
+    no decoded copy of the page has to be made first.
+    """
+    return BeautifulSoup(html, 'lxml', parse_only=parse_only)
+
+def parse_scripts_only(html) -> BeautifulSoup:
+    """Parse only the <script> tags of a page.
+    
+    Skipping the rest of the document makes tree building much cheaper, but the
+    returned soup contains nothing except script elements, so it must not be
+    handed to extractors that look at markup or visible text.
+    """
+    return parse_html(html, parse_only=SCRIPT_STRAINER)
+
+# One connection pool for the whole process, so TLS sessions and DNS lookups
+# are reused across scrapes instead of being rebuilt per WebScraper
+_shared_session: Optional[aiohttp.ClientSession] = None
+_shared_session_lock = asyncio.Lock()
+
+async def get_shared_session() -> aiohttp.ClientSession:
+    """Return the process-wide aiohttp session, creating it on first use"""
+    global _shared_session
+    if _shared_session is not None and not _shared_session.closed:
+        return _shared_session
+    
+    async with _shared_session_lock:
+        if _shared_session is None or _shared_session.closed:
+            # Create SSL context with proper certificate verification
+            ssl_context = ssl.create_default_context(cafile=certifi.where())
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+            
+            # Try to use AsyncResolver if aiodns is available, otherwise fall back to default
+            try:
+                resolver = aiohttp.AsyncResolver()
+            except RuntimeError:
+                logger.warning("aiodns not available, using default resolver")
+                resolver = None
+            
+            connector = aiohttp.TCPConnector(
+                limit=1024,
+                limit_per_host=64,
+                ssl=ssl_context,
+                resolver=resolver,
+                use_dns_cache=True,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+            
+            timeout = aiohttp.ClientTimeout(total=settings.request_timeout)
+            _shared_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers={
+                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                    'Accept-Language': 'en-US,en;q=0.5',
+                    'Accept-Encoding': 'gzip, br, deflate',
+                    'DNT': '1',
+                    'Connection': 'keep-alive',
+                    'Upgrade-Insecure-Requests': '1'
+                }
+            )
+    return _shared_session
+
+async def close_shared_session() -> None:
+    """Close the process-wide aiohttp session (called on app shutdown)"""
+    global _shared_session
+    if _shared_session is not None and not _shared_session.closed:
+        await _shared_session.close()
+    _shared_session = None
+
+class HostRateLimiter:
+    """Per-host token bucket, paced by rate-limit response headers when a host sends them"""
+    
+    def __init__(self, rate: float = 1.0):
+        # Requests per second allowed for hosts that don't advertise a limit
+        self.rate = rate
+        self._buckets: Dict[str, tuple] = {}  # host -> (tokens, last_refill)
+        self._blocked_until: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+    
+    async def acquire(self, host: str) -> None:
+        """Wait until a request to host is allowed"""
+        lock = self._locks.get(host)
+        if lock is None:
+            lock = self._locks[host] = asyncio.Lock()
+        
+        async with lock:
+            blocked_for = self._blocked_until.get(host, 0.0) - time.monotonic()
+            if blocked_for > 0:
+                await asyncio.sleep(blocked_for)
+            
+            if self.rate <= 0:
+                return
+            
+            now = time.monotonic()
+            tokens, last_refill = self._buckets.get(host, (1.0, now))
+            tokens = min(1.0, tokens + (now - last_refill) * self.rate)
+            if tokens < 1.0:
+                await asyncio.sleep((1.0 - tokens) / self.rate)
+                now = time.monotonic()
+                tokens = 1.0
+            self._buckets[host] = (tokens - 1.0, now)
+    
+    def update(self, host: str, headers) -> None:
+        """Adjust pacing for host from Retry-After / X-RateLimit-* headers"""
+        now = time.monotonic()
+        
+        retry_after = headers.get('Retry-After')
+        if retry_after and retry_after.strip().isdigit():
+            self._blocked_until[host] = now + int(retry_after)
+            return
+        
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is None or not remaining.strip().isdigit():
+            return
+        
+        if int(remaining) > 0:
+            # The host says there is budget left, so don't pace the next request
+            self._buckets[host] = (1.0, now)
+        else:
+            reset = headers.get('X-RateLimit-Reset', '')
+            try:
+                reset_value = float(reset)
+            except ValueError:
+                return
+            # Reset is either seconds from now or an epoch timestamp
+            if reset_value > 1e9:
+                reset_value -= time.time()
+            self._blocked_until[host] = now + max(reset_value, 0.0)
+
 class WebScraper:
     """Base web scraper with retry logic and error handling"""
     
+    # In-flight request limits shared by every scraper in the process
+    _semaphore = asyncio.Semaphore(settings.max_concurrent_requests)
+    _host_semaphores: Dict[str, asyncio.Semaphore] = {}
+    _rate_limiter = HostRateLimiter(
+        rate=1.0 / settings.rate_limit_delay if settings.rate_limit_delay > 0 else 0.0
+    )
+    
     def __init__(self):
         self.ua = UserAgent()
         self.session = None
         
     async def __aenter__(self):
-        # Create SSL context with proper certificate verification
-        ssl_context = ssl.create_default_context(cafile=certifi.where())
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        # Try to use AsyncResolver if aiodns is available, otherwise fall back to default
-        try:
-            resolver = aiohttp.AsyncResolver()
-        except RuntimeError:
-            logger.warning("aiodns not available, using default resolver")
-            resolver = None
-        
-        connector = aiohttp.TCPConnector(
-            limit=10, 
-            limit_per_host=5,
-            ssl=ssl_context,
-            resolver=resolver,
-            use_dns_cache=True
-        )
-        
-        timeout = aiohttp.ClientTimeout(total=settings.request_timeout)
-        self.session = aiohttp.ClientSession(
-            connector=connector,
-            timeout=timeout,
-            headers={
-                'User-Agent': self.ua.random,
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }
-        )
+        self.session = await get_shared_session()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        # The shared session outlives this scraper; it is closed on app shutdown
+        pass
     
-    async def fetch_page(self, url: str, retries: Optional[int] = None) -> Optional[str]:
-        """Fetch a single page with retry logic and fallback mechanisms"""
+    @classmethod
+    def _host_semaphore(cls, host: str) -> asyncio.Semaphore:
+        """Get the semaphore bounding concurrent requests to host"""
+        semaphore = cls._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.max_concurrent_requests_per_host)
+            cls._host_semaphores[host] = semaphore
+        return semaphore
+    
+    async def fetch_page(self, url: str, retries: Optional[int] = None) -> Optional[bytes]:
+        """Fetch a single page with retry logic.
+        
+        The raw body is returned undecoded; BeautifulSoup, lxml, selectolax and
+        json.loads all accept bytes and sniff the encoding themselves.
+        """
         if retries is None:
             retries = settings.max_retries
             
@@ -71,21 +249,29 @@ class WebScraper:
             logger.error("Session not initialized. Use async context manager.")
             return None
             
-        # Try async approach first
+        host = get_domain(url).lower()
         for attempt in range(retries + 1):
             try:
-                async with self.session.get(url, allow_redirects=True) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        await asyncio.sleep(settings.rate_limit_delay)
-                        return content
-                    elif response.status == 404:
-                        logger.warning(f"Page not found: {url}")
-                        break
-                    elif response.status in [403, 429]:
-                        logger.warning(f"Access denied or rate limited for {url}, attempt {attempt + 1}")
-                    else:
-                        logger.warning(f"HTTP {response.status} for {url}, attempt {attempt + 1}")
+                # Wait for a host slot and the host's pacing before taking a
+                # global slot, so a slow host cannot hold global slots while it queues
+                async with self._host_semaphore(host):
+                    await self._rate_limiter.acquire(host)
+                    async with self._semaphore, self.session.get(url, allow_redirects=True, headers={'User-Agent': self.ua.random}) as response:
+                        self._rate_limiter.update(host, response.headers)
+                        if response.status == 200:
+                            content = await response.read()
+                        elif response.status == 404:
+                            logger.warning(f"Page not found: {url}")
+                            return None
+                        elif response.status in [403, 429]:
+                            content = None
+                            logger.warning(f"Access denied or rate limited for {url}, attempt {attempt + 1}")
+                        else:
+                            content = None
+                            logger.warning(f"HTTP {response.status} for {url}, attempt {attempt + 1}")
+                
+                if content is not None:
+                    return content
                         
             except asyncio.TimeoutError:
                 logger.warning(f"Timeout for {url}, attempt {attempt + 1}")
@@ -95,108 +281,129 @@ class WebScraper:
                 logger.error(f"Unexpected error fetching {url}: {str(e)}, attempt {attempt + 1}")
                 
             if attempt < retries:
-                wait_time = min(2 ** attempt, 10)  # Exponential backoff with max 10 seconds
+                # Exponential backoff with max 10 seconds; jittered so scrapers that
+                # were throttled together don't all retry the host at once
+                wait_time = min(2 ** attempt, 10) * random.uniform(0.5, 1.0)
                 await asyncio.sleep(wait_time)
         
-        # Fallback to synchronous requests if async fails
-        logger.info(f"Async fetch failed for {url}, trying synchronous fallback")
-        return self.fetch_page_sync(url)
-    
-    def fetch_page_sync(self, url: str) -> Optional[str]:
-        """Synchronous fallback for fetching pages with better error handling"""
-        try:
-            headers = {
-                'User-Agent': self.ua.random,
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }
-            
-            # Try with different verification settings
-            for verify_ssl in [True, False]:
-                try:
-                    response = requests.get(
-                        url, 
-                        headers=headers, 
-                        timeout=settings.request_timeout,
-                        verify=verify_ssl,
-                        allow_redirects=True
-                    )
-                    response.raise_for_status()
-                    return response.text
-                except requests.exceptions.SSLError:
-                    if verify_ssl:
-                        logger.warning(f"SSL verification failed for {url}, trying without verification")
-                        continue
-                    else:
-                        raise
-                except requests.exceptions.RequestException as e:
-                    logger.error(f"Request error for {url}: {str(e)}")
-                    if verify_ssl:
-                        continue
-                    else:
-                        break
-                        
-        except Exception as e:
-            logger.error(f"Error fetching {url}: {str(e)}")
-            
+        logger.error(f"Failed to fetch {url} after {retries + 1} attempts")
         return None
 
+@lru_cache(maxsize=4096)
+def _is_myshopify_url(url: str) -> bool:
+    return 'myshopify.com' in url
+
 class ShopifyDetector:
     """Utility class to detect and validate Shopify stores"""
     
-    @staticmethod
-    def is_shopify_store(html_content: str, url: str) -> bool:
+    # Hosts already confirmed as Shopify stores, so later pages skip the HTML scan
+    _verified_hosts: Dict[str, bool] = {}
+    _max_verified_hosts = 4096
+    
+    @classmethod
+    def is_shopify_store(cls, html_content: Union[str, bytes], url: str) -> bool:
         """Check if the website is a Shopify store"""
         if not html_content:
             return False
-            
-        shopify_indicators = [
-            'Shopify.theme',
-            'shopify.com',
-            'cdn.shopify.com',
-            'Shopify.shop',
-            'shopify-features',
-            'shopify-section',
-            'myshopify.com'
-        ]
         
         # Check URL for myshopify.com
-        if 'myshopify.com' in url:
+        if _is_myshopify_url(url):
             return True
-            
-        # Check HTML content for Shopify indicators
-        html_lower = html_content.lower()
-        return any(indicator.lower() in html_lower for indicator in shopify_indicators)
+        
+        host = get_domain(url)
+        if cls._verified_hosts.get(host):
+            return True
+        
+        if cls._scan_html(html_content):
+            if len(cls._verified_hosts) >= cls._max_verified_hosts:
+                cls._verified_hosts.clear()
+            cls._verified_hosts[host] = True
+            return True
+        return False
+    
+    @staticmethod
+    def _scan_html(html_content: Union[str, bytes]) -> bool:
+        """Look for Shopify markers in the page HTML"""
+        # Every indicator contains "shopify", so a plain substring probe (memchr-backed
+        # in CPython) rejects most non-Shopify pages before the regex runs at all
+        if isinstance(html_content, bytes):
+            if b'shopify' not in html_content and b'Shopify' not in html_content:
+                return False
+            return bool(_SHOPIFY_BYTES_RE.search(html_content))
+        
+        if 'shopify' not in html_content and 'Shopify' not in html_content:
+            return False
+        return bool(_SHOPIFY_RE.search(html_content))
     
     @staticmethod
-    def extract_shopify_data(soup: BeautifulSoup) -> Dict[str, Any]:
-        """Extract Shopify-specific data from parsed HTML"""
+    def extract_shopify_data(html: Union[str, bytes]) -> Dict[str, Any]:
+        """Extract Shopify-specific data from raw HTML"""
         data = {}
+        if not html:
+            return data
         
         # Look for Shopify script tags
-        scripts = soup.find_all('script')
-        for script in scripts:
-            # Get script content safely
-            content = script.get_text() if script else None
-            if content:
-                # Extract shop data
-                if 'Shopify.shop' in content:
-                    shop_match = re.search(r'Shopify\.shop\s*=\s*"([^"]+)"', content)
-                    if shop_match:
-                        data['shop_domain'] = shop_match.group(1)
-                
-                # Extract currency
-                if 'Shopify.currency' in content:
-                    currency_match = re.search(r'Shopify\.currency\s*=\s*["\']([^"\']+)["\']', content)
-                    if currency_match:
-                        data['currency'] = currency_match.group(1)
+        if LexborHTMLParser is not None:
+            contents = (node.text() for node in LexborHTMLParser(html).css('script'))
+        else:
+            contents = (script.get_text() for script in parse_scripts_only(html).find_all('script'))
+        
+        for content in contents:
+            # Cheap substring check before running any regex
+            if not content or 'Shopify.' not in content:
+                continue
+            
+            # Extract shop data
+            if 'Shopify.shop' in content:
+                shop_match = _SHOPIFY_SHOP_RE.search(content)
+                if shop_match:
+                    data['shop_domain'] = shop_match.group(1)
+            
+            # Extract currency
+            if 'Shopify.currency' in content:
+                currency_match = _SHOPIFY_CURRENCY_RE.search(content)
+                if currency_match:
+                    data['currency'] = currency_match.group(1)
         
         return data
 
+@lru_cache(maxsize=4096)
+def is_valid_url(url: str) -> bool:
+    """Check if URL is valid"""
+    try:
+        result = URL(url)
+        return all([result.scheme, result.raw_authority])
+    except Exception:
+        return False
+
+@lru_cache(maxsize=4096)
+def get_domain(url: str) -> str:
+    """Extract domain from URL"""
+    try:
+        # raw_authority is the same "host[:port]" string urlparse calls netloc
+        return URL(url).raw_authority
+    except Exception:
+        return ""
+
+@lru_cache(maxsize=4096)
+def canonical_url(url: str) -> str:
+    """Canonical form of a store URL for use as a cache/DB key.
+    
+    Lowercases scheme and host, drops utm_* tracking parameters and the
+    fragment, and strips the trailing slash. Scheme-less input is returned
+    stripped but otherwise untouched so URL validation still sees it as given.
+    """
+    url = url.strip()
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        return url
+    
+    query = parts.query
+    if 'utm_' in query:
+        query = urlencode([(k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+                           if not k.lower().startswith('utm_')])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), query, ''))
+
 class URLUtils:
     """Utility class for URL operations"""
     
@@ -207,22 +414,9 @@ class URLUtils:
             return url
         return urljoin(base_url, url)
     
-    @staticmethod
-    def is_valid_url(url: str) -> bool:
-        """Check if URL is valid"""
-        try:
-            result = urlparse(url)
-            return all([result.scheme, result.netloc])
-        except Exception:
-            return False
-    
-    @staticmethod
-    def get_domain(url: str) -> str:
-        """Extract domain from URL"""
-        try:
-            return urlparse(url).netloc
-        except Exception:
-            return ""
+    # Pure functions of the URL, cached at module level
+    is_valid_url = staticmethod(is_valid_url)
+    get_domain = staticmethod(get_domain)
 
 class TextCleaner:
     """Utility class for text cleaning and processing"""
@@ -234,9 +428,9 @@ class TextCleaner:
             return ""
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s\.\,\!\?\-\(\)]', '', text)
+        text = _SPECIAL_CHARS_RE.sub('', text)
         return text.strip()
     
     @staticmethod
@@ -245,16 +439,8 @@ class TextCleaner:
         if not text:
             return None
             
-        # Common price patterns
-        price_patterns = [
-            r'[\$₹€£¥][\d,]+\.?\d*',
-            r'[\d,]+\.?\d*\s*[\$₹€£¥]',
-            r'Rs\.?\s*[\d,]+\.?\d*',
-            r'USD\s*[\d,]+\.?\d*'
-        ]
-        
-        for pattern in price_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _PRICE_RES:
+            match = pattern.search(text)
             if match:
                 return match.group(0).strip()
         
@@ -266,9 +452,8 @@ class TextCleaner:
         if not text:
             return []
             
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        return list(set(emails))  # Remove duplicates
+        # Accumulate into a set so repeated hits never build a full match list
+        return list({m.group(0) for m in _EMAIL_RE.finditer(text)})
     
     @staticmethod
     def extract_phone_numbers(text: str) -> List[str]:
@@ -276,16 +461,33 @@ class TextCleaner:
         if not text:
             return []
             
-        phone_patterns = [
-            r'\+\d{1,3}[-.\s]?\d{3,4}[-.\s]?\d{3,4}[-.\s]?\d{3,4}',
-            r'\(\d{3}\)\s*\d{3}[-.\s]?\d{4}',
-            r'\d{3}[-.\s]?\d{3}[-.\s]?\d{4}',
-            r'\+\d{10,15}'
-        ]
+        phones = set()
+        for pattern in _PHONE_RES:
+            phones.update(m.group(0) for m in pattern.finditer(text))
+        
+        return list(phones)
+    
+    @staticmethod
+    def product_fingerprint(name: Optional[str], product_url: Optional[str] = None) -> Optional[str]:
+        """Key under which the HTML and JSON-LD copies of a product collide.
+        
+        Falls back to the raw name, then the product URL, when cleaning leaves
+        nothing; None means the product has nothing to be matched on.
+        """
+        name = (name or '').casefold()
+        # Split/join again: clean_text drops separators like "|" after collapsing spaces
+        fingerprint = ' '.join(TextCleaner.clean_text(_PRODUCT_NAME_SUFFIX_RE.sub('', name)).split())
+        return fingerprint or name or product_url or None
+    
+    @staticmethod
+    def extract_all(text: str) -> Dict[str, List[str]]:
+        """Extract emails, phone numbers and prices from text in a single pass"""
+        found: Dict[str, set] = {key: set() for key in _CONTACT_KEYS.values()}
+        if not text:
+            return {key: [] for key in found}
         
-        phones = []
-        for pattern in phone_patterns:
-            matches = re.findall(pattern, text)
-            phones.extend(matches)
+        for match in _CONTACT_SCANNER.finditer(text):
+            kind = (match.lastgroup or '').rstrip('0123456789')
+            found[_CONTACT_KEYS[kind]].add(match.group(0).strip())
         
-        return list(set(phones))  # Remove duplicates
\ No newline at end of file
+        return {key: list(values) for key, values in found.items()}
\ No newline at end of file
@@ -1 +1,20 @@
 # Database module for Shopify Insights Fetcher
+import threading
+from typing import Optional
+
+_db_manager: Optional["DatabaseManager"] = None
+_db_manager_lock = threading.Lock()
+
+def get_db_manager() -> "DatabaseManager":
+    """Return the process-wide DatabaseManager, connecting on first use.
+    
+    SQLAlchemy is only imported here, so deployments running with
+    ENABLE_DB_STORAGE=false never load it or open a connection pool.
+    """
+    global _db_manager
+    if _db_manager is None:
+        with _db_manager_lock:
+            if _db_manager is None:
+                from database.models import DatabaseManager
+                _db_manager = DatabaseManager()
+    return _db_manager
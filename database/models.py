@@ -1,46 +1,55 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, JSON, func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 import logging
-import json
-from config.settings import Settings
+import orjson
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+# Store columns that save_store_insights copies from the insights payload
+_STORE_INSIGHT_FIELDS = (
+    'brand_name', 'brand_description', 'logo_url', 'hero_products',
+    'product_catalog', 'social_handles', 'contact_details', 'privacy_policy',
+    'return_policy', 'refund_policy', 'faqs', 'important_links',
+)
+
 class Store(Base):
     __tablename__ = 'store'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    website_url = Column(Text, nullable=False, unique=True)
+    website_url = Column(String(512), nullable=False, unique=True, index=True)
     brand_name = Column(Text)
     brand_description = Column(Text)
     logo_url = Column(Text)
-    hero_products = Column(Text)  # Store as JSON string
-    product_catalog = Column(Text)  # Store as JSON string
-    social_handles = Column(Text)  # Store as JSON string
-    contact_details = Column(Text)  # Store as JSON string
-    privacy_policy = Column(Text)  # Store as JSON string
-    return_policy = Column(Text)  # Store as JSON string
-    refund_policy = Column(Text)  # Store as JSON string
-    faqs = Column(Text)  # Store as JSON string
-    important_links = Column(Text)  # Store as JSON string
+    hero_products = Column(JSON)
+    product_catalog = Column(JSON)
+    social_handles = Column(JSON)
+    contact_details = Column(JSON)
+    privacy_policy = Column(JSON)
+    return_policy = Column(JSON)
+    refund_policy = Column(JSON)
+    faqs = Column(JSON)
+    important_links = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Indexed for the newest-first store listing
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
 class CompetitorAnalysis(Base):
     __tablename__ = 'competitor_analysis'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     original_brand = Column(Text, nullable=False)
-    original_url = Column(Text, nullable=False)
+    original_url = Column(String(512), nullable=False, index=True)
     competitors_found = Column(Integer, default=0)
     competitors_analyzed = Column(Integer, default=0)
-    competitor_insights = Column(Text)  # JSON string
-    analysis_summary = Column(Text)  # JSON string
+    competitor_insights = Column(JSON)
+    analysis_summary = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -48,7 +57,7 @@ class DatabaseManager:
     """Database manager for Shopify Insights Fetcher"""
     
     def __init__(self):
-        self.settings = Settings()
+        self.settings = settings
         self.engine = None
         self.SessionLocal = None
         self._initialize_database()
@@ -60,6 +69,8 @@ class DatabaseManager:
                 self.settings.database_url,
                 pool_size=self.settings.database_pool_size,
                 max_overflow=self.settings.database_max_overflow,
+                json_serializer=lambda obj: orjson.dumps(obj).decode(),
+                json_deserializer=orjson.loads,
                 echo=False  # Set to True for SQL debugging
             )
             
@@ -85,59 +96,22 @@ class DatabaseManager:
         """Save complete store insights to database"""
         session = self.get_session()
         try:
-            # Create or update store record
-            store = session.query(Store).filter_by(website_url=insights_data['website_url']).first()
+            # Upsert the store record in a single round trip
+            payload = {'website_url': insights_data['website_url']}
+            for field in _STORE_INSIGHT_FIELDS:
+                if field in insights_data:
+                    payload[field] = insights_data[field]
             
-            if store:
-                # Update existing store
-                if 'brand_name' in insights_data:
-                    store.brand_name = insights_data['brand_name']  # type: ignore
-                if 'brand_description' in insights_data:
-                    store.brand_description = insights_data['brand_description']  # type: ignore
-                if 'logo_url' in insights_data:
-                    store.logo_url = insights_data['logo_url']  # type: ignore
-                if 'hero_products' in insights_data:
-                    store.hero_products = json.dumps(insights_data['hero_products']) if insights_data['hero_products'] else None  # type: ignore
-                if 'product_catalog' in insights_data:
-                    store.product_catalog = json.dumps(insights_data['product_catalog']) if insights_data['product_catalog'] else None  # type: ignore
-                if 'social_handles' in insights_data:
-                    store.social_handles = json.dumps(insights_data['social_handles']) if insights_data['social_handles'] else None  # type: ignore
-                if 'contact_details' in insights_data:
-                    store.contact_details = json.dumps(insights_data['contact_details']) if insights_data['contact_details'] else None  # type: ignore
-                if 'privacy_policy' in insights_data:
-                    store.privacy_policy = json.dumps(insights_data['privacy_policy']) if insights_data['privacy_policy'] else None  # type: ignore
-                if 'return_policy' in insights_data:
-                    store.return_policy = json.dumps(insights_data['return_policy']) if insights_data['return_policy'] else None  # type: ignore
-                if 'refund_policy' in insights_data:
-                    store.refund_policy = json.dumps(insights_data['refund_policy']) if insights_data['refund_policy'] else None  # type: ignore
-                if 'faqs' in insights_data:
-                    store.faqs = json.dumps(insights_data['faqs']) if insights_data['faqs'] else None  # type: ignore
-                if 'important_links' in insights_data:
-                    store.important_links = json.dumps(insights_data['important_links']) if insights_data['important_links'] else None  # type: ignore
-                
-                store.updated_at = datetime.utcnow()  # type: ignore
-            else:
-                # Create new store
-                store = Store(
-                    website_url=insights_data['website_url'],
-                    brand_name=insights_data.get('brand_name'),
-                    brand_description=insights_data.get('brand_description'),
-                    logo_url=insights_data.get('logo_url'),
-                    hero_products=json.dumps(insights_data.get('hero_products', [])) if insights_data.get('hero_products') else None,
-                    product_catalog=json.dumps(insights_data.get('product_catalog', [])) if insights_data.get('product_catalog') else None,
-                    social_handles=json.dumps(insights_data.get('social_handles', {})) if insights_data.get('social_handles') else None,
-                    contact_details=json.dumps(insights_data.get('contact_details', {})) if insights_data.get('contact_details') else None,
-                    privacy_policy=json.dumps(insights_data.get('privacy_policy', {})) if insights_data.get('privacy_policy') else None,
-                    return_policy=json.dumps(insights_data.get('return_policy', {})) if insights_data.get('return_policy') else None,
-                    refund_policy=json.dumps(insights_data.get('refund_policy', {})) if insights_data.get('refund_policy') else None,
-                    faqs=json.dumps(insights_data.get('faqs', [])) if insights_data.get('faqs') else None,
-                    important_links=json.dumps(insights_data.get('important_links', [])) if insights_data.get('important_links') else None
-                )
-                session.add(store)
+            stmt = mysql_insert(Store).values(**payload)
+            updates = {k: stmt.inserted[k] for k in payload if k != 'website_url'}
+            updates['updated_at'] = datetime.utcnow()
+            # LAST_INSERT_ID(id) makes the existing row's id available on update
+            updates['id'] = func.LAST_INSERT_ID(Store.id)
+            stmt = stmt.on_duplicate_key_update(**updates)
             
+            result = session.execute(stmt)
             session.commit()
-            session.refresh(store)
-            store_id = store.id  # type: ignore
+            store_id = result.lastrowid
             
             logger.info(f"Successfully saved insights for store ID: {store_id}")
             return store_id  # type: ignore
@@ -164,15 +138,15 @@ class DatabaseManager:
                 'brand_name': store.brand_name,  # type: ignore
                 'brand_description': store.brand_description,  # type: ignore
                 'logo_url': store.logo_url,  # type: ignore
-                'hero_products': json.loads(store.hero_products) if store.hero_products else [],  # type: ignore
-                'product_catalog': json.loads(store.product_catalog) if store.product_catalog else [],  # type: ignore
-                'social_handles': json.loads(store.social_handles) if store.social_handles else {},  # type: ignore
-                'contact_details': json.loads(store.contact_details) if store.contact_details else {},  # type: ignore
-                'privacy_policy': json.loads(store.privacy_policy) if store.privacy_policy else {},  # type: ignore
-                'return_policy': json.loads(store.return_policy) if store.return_policy else {},  # type: ignore
-                'refund_policy': json.loads(store.refund_policy) if store.refund_policy else {},  # type: ignore
-                'faqs': json.loads(store.faqs) if store.faqs else [],  # type: ignore
-                'important_links': json.loads(store.important_links) if store.important_links else [],  # type: ignore
+                'hero_products': store.hero_products or [],  # type: ignore
+                'product_catalog': store.product_catalog or [],  # type: ignore
+                'social_handles': store.social_handles or {},  # type: ignore
+                'contact_details': store.contact_details or {},  # type: ignore
+                'privacy_policy': store.privacy_policy or {},  # type: ignore
+                'return_policy': store.return_policy or {},  # type: ignore
+                'refund_policy': store.refund_policy or {},  # type: ignore
+                'faqs': store.faqs or [],  # type: ignore
+                'important_links': store.important_links or [],  # type: ignore
                 'created_at': store.created_at.isoformat() if store.created_at else None,  # type: ignore
                 'updated_at': store.updated_at.isoformat() if store.updated_at else None  # type: ignore
             }
@@ -185,11 +159,19 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def list_all_stores(self) -> List[Dict[str, Any]]:
-        """List all stores with basic information"""
+    def list_all_stores(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """List stores with basic information, most recently updated first"""
         session = self.get_session()
         try:
-            stores = session.query(Store).all()
+            # Project only the listed columns so the JSON blobs are never loaded
+            stmt = select(
+                Store.id, Store.website_url, Store.brand_name,
+                Store.created_at, Store.updated_at
+            ).order_by(Store.updated_at.desc(), Store.id.desc()).offset(offset)
+            if limit is not None:
+                stmt = stmt.limit(limit)
+            stmt = stmt.execution_options(yield_per=500)
+            stores = session.execute(stmt)
             
             stores_list = []
             for store in stores:
@@ -209,6 +191,17 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def count_stores(self) -> int:
+        """Count all stored stores"""
+        session = self.get_session()
+        try:
+            return session.scalar(select(func.count()).select_from(Store)) or 0
+        except Exception as e:
+            logger.error(f"Failed to count stores: {e}")
+            return 0
+        finally:
+            session.close()
+    
     def delete_store_insights(self, website_url: str) -> bool:
         """Delete all insights for a specific store"""
         session = self.get_session()
@@ -236,14 +229,7 @@ class DatabaseManager:
         """Save competitor analysis results to database"""
         session = self.get_session()
         try:
-            analysis = CompetitorAnalysis(
-                original_brand=analysis_data.get('original_brand', ''),
-                original_url=analysis_data.get('original_url', ''),
-                competitors_found=analysis_data.get('competitors_found', 0),
-                competitors_analyzed=analysis_data.get('competitors_analyzed', 0),
-                competitor_insights=json.dumps(analysis_data.get('competitor_insights', [])),
-                analysis_summary=json.dumps(analysis_data.get('analysis_summary', {}))
-            )
+            analysis = CompetitorAnalysis(**self._competitor_analysis_values(analysis_data))
             
             session.add(analysis)
             session.commit()
@@ -260,6 +246,18 @@ class DatabaseManager:
         finally:
             session.close()
 
+    @staticmethod
+    def _competitor_analysis_values(analysis_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map an analysis result onto CompetitorAnalysis column values"""
+        return {
+            'original_brand': analysis_data.get('original_brand', ''),
+            'original_url': analysis_data.get('original_url', ''),
+            'competitors_found': analysis_data.get('competitors_found', 0),
+            'competitors_analyzed': analysis_data.get('competitors_analyzed', 0),
+            'competitor_insights': analysis_data.get('competitor_insights', []),
+            'analysis_summary': analysis_data.get('analysis_summary', {})
+        }
+    
     def get_competitor_analysis(self, original_url: str) -> Optional[Dict[str, Any]]:
         """Retrieve competitor analysis from database"""
         session = self.get_session()
@@ -274,8 +272,8 @@ class DatabaseManager:
                 'original_url': analysis.original_url,  # type: ignore
                 'competitors_found': analysis.competitors_found,  # type: ignore
                 'competitors_analyzed': analysis.competitors_analyzed,  # type: ignore
-                'competitor_insights': json.loads(analysis.competitor_insights) if analysis.competitor_insights else [],  # type: ignore
-                'analysis_summary': json.loads(analysis.analysis_summary) if analysis.analysis_summary else {},  # type: ignore
+                'competitor_insights': analysis.competitor_insights or [],  # type: ignore
+                'analysis_summary': analysis.analysis_summary or {},  # type: ignore
                 'created_at': analysis.created_at.isoformat() if analysis.created_at else None,  # type: ignore
                 'updated_at': analysis.updated_at.isoformat() if analysis.updated_at else None  # type: ignore
             }
@@ -287,6 +285,3 @@ class DatabaseManager:
             return None
         finally:
             session.close()
-
-# Global database manager instance
-db_manager = DatabaseManager()
@@ -1,40 +1,81 @@
+import atexit
 import logging
+import queue
 import asyncio
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from logging.handlers import QueueHandler, QueueListener
+from fastapi import FastAPI, HTTPException, Depends, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
-from pydantic import BaseModel, HttpUrl
-from typing import Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, TypeAdapter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from contextlib import asynccontextmanager
 from datetime import datetime
-import traceback
+from uuid import uuid4
 import json
+import orjson
 
-from core.models import BrandInsights, ErrorResponse, SuccessResponse, CompetitorAnalysisResponse
+from core.responses import (
+    ORJSONResponse, iter_json_envelope, iter_json_envelope_chunks, iter_splice_json_list,
+    json_envelope, orjson_default, splice_json
+)
+from core.models import BrandInsights, ErrorResponse, ProductModel, SuccessResponse, CompetitorAnalysisResponse
 from modules.shopify_service import ShopifyInsightsService
 from modules.competitor_analyzer import CompetitorAnalyzer
-from database.models import db_manager
+from core.utils import canonical_url, close_shared_session, get_shared_session
+from core.cache import insights_cache
+from core.tasks import celery_app, scrape_insights_task
+if celery_app is not None:
+    from celery.result import AsyncResult
+from database import get_db_manager
 from config.settings import settings
 
-# Configure logging
+# Configure logging: handlers only enqueue records, and a listener thread does the
+# actual file/console writes so request handlers never block on disk I/O
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [logging.FileHandler(settings.log_file), logging.StreamHandler()]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_queue_handler = QueueHandler(_log_queue)
+# QueueHandler.prepare() only merges args into the message; the listener's
+# handlers apply the real format
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
 logging.basicConfig(
     level=getattr(logging, settings.log_level.upper()),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(settings.log_file),
-        logging.StreamHandler()
-    ]
+    handlers=[_queue_handler]
 )
+_log_listener = QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks"""
+    # Open the shared scraping session up front so the first request doesn't pay for it
+    app.state.http = await get_shared_session()
+    # Connect and create the connection pool once, before serving requests
+    if settings.enable_db_storage:
+        await asyncio.to_thread(get_db_manager)
+    yield
+    # Close the shared scraping session once, when the app stops
+    await close_shared_session()
+    await insights_cache.close()
+
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="A comprehensive API for extracting insights from Shopify stores",
-    docs_url="/docs",
-    redoc_url="/redoc"
+    # Interactive docs and the OpenAPI schema are only served in debug mode
+    docs_url="/docs" if settings.debug else None,
+    redoc_url="/redoc" if settings.debug else None,
+    openapi_url="/openapi.json" if settings.debug else None,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -46,140 +87,247 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON bodies; insights for large catalogs run to hundreds of KB
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Initialize services
 insights_service = ShopifyInsightsService()
 competitor_analyzer = CompetitorAnalyzer()
 
-# Custom JSON response function for datetime serialization
-def custom_json_response(content: dict, status_code: int = 200):
-    def json_serializer(obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+# Listings and product catalogs longer than this are streamed rather than encoded in one go
+STREAM_THRESHOLD = 500
+
+# Built once; dump_json goes from model to JSON bytes without a dict in between
+_INSIGHTS_ADAPTER = TypeAdapter(BrandInsights)
+_SUCCESS_ADAPTER = TypeAdapter(SuccessResponse)
+_PRODUCT_ADAPTER = TypeAdapter(ProductModel)
+
+# Scrapes currently in progress, so concurrent identical requests share one
+_inflight: Dict[str, asyncio.Future] = {}
+
+# In-process /insights/async tasks still running, by id. Holding the task here
+# keeps it from being garbage collected; finished outcomes live in insights_cache.
+_running_tasks: Dict[str, asyncio.Task] = {}
+
+async def single_flight(key: str, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+    """Run coro_factory() once per key at a time; concurrent callers await the same result"""
+    future = _inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(coro_factory())
+        _inflight[key] = future
+        future.add_done_callback(lambda f: _inflight.pop(key, None) if _inflight.get(key) is f else None)
+    # Shield so one disconnecting client doesn't cancel the work for the others
+    return await asyncio.shield(future)
+
+def _flight_key(prefix: str, website_url: str) -> str:
+    return f"{prefix}:{canonical_url(website_url)}"
+
+async def cached_fetch_insights(website_url: str, refresh: bool = False) -> BrandInsights:
+    """Fetch insights through the insights cache when caching is enabled
+    
+    refresh skips the cache lookup and re-scrapes, overwriting the cached entry
+    """
+    if not settings.cache_enabled:
+        return await single_flight(
+            _flight_key("insights", website_url),
+            lambda: insights_service.fetch_insights(website_url)
+        )
+    
+    insights = None if refresh else await insights_cache.get(website_url)
+    if insights is not None:
+        logger.info("Serving cached insights for: %s", website_url)
+        return insights
+    
+    async def fetch_and_cache() -> BrandInsights:
+        insights = await insights_service.fetch_insights(website_url)
+        await insights_cache.set(website_url, insights)
+        return insights
+    
+    return await single_flight(_flight_key("insights", website_url), fetch_and_cache)
+
+async def run_competitor_analysis(brand_name: str, website_url: str,
+                                  base_insights: Optional[BrandInsights] = None,
+                                  concurrency: int = 8) -> Dict[str, Any]:
+    """Analyze competitors and store the result; concurrent calls for a URL share one run"""
+    async def analyze_and_save() -> Dict[str, Any]:
+        analysis_result = await competitor_analyzer.analyze_competitors(
+            brand_name,
+            website_url,
+            insights_service,
+            base_insights=base_insights,
+            concurrency=concurrency
+        )
+        
+        # Save competitor analysis to database
+        if settings.enable_db_storage:
+            try:
+                logger.info("Saving competitor analysis to database")
+                analysis_id = await asyncio.to_thread(get_db_manager().save_competitor_analysis, analysis_result)
+                logger.info("Successfully saved competitor analysis with ID: %s", analysis_id)
+                analysis_result['analysis_id'] = analysis_id
+            except Exception as e:
+                logger.error("Failed to save competitor analysis to database: %s", e)
+                # Continue without failing the request
+        
+        return analysis_result
     
-    # Use FastAPI's jsonable_encoder which handles datetime objects
-    json_compatible_content = jsonable_encoder(content)
-    return JSONResponse(content=json_compatible_content, status_code=status_code)
+    return await single_flight(_flight_key("competitors", website_url), analyze_and_save)
+
+async def stored_competitor_analysis(website_url: str) -> Optional[Dict[str, Any]]:
+    """Look up a saved competitor analysis; always a miss without database storage"""
+    if not settings.enable_db_storage:
+        return None
+    return await asyncio.to_thread(get_db_manager().get_competitor_analysis, website_url)
+
+async def require_db_storage() -> None:
+    """Dependency for endpoints that only work with database storage enabled"""
+    if not settings.enable_db_storage:
+        raise HTTPException(status_code=503, detail="Database storage is disabled")
+
+class BatchInsightsRequest(BaseModel):
+    urls: List[HttpUrl] = Field(min_length=1)
+    # Stores scraped at the same time; defaults to settings.max_concurrent_stores
+    max_concurrency: Optional[int] = Field(default=None, ge=1, le=20)
+    
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "urls": ["https://example.myshopify.com", "https://another.myshopify.com"],
+            "max_concurrency": 8
+        }
+    })
+
+# (needle, status code, message), checked in order against the lowercased error
+_ERR_RULES = (
+    ("not found", 404, "Website not found or not accessible"),
+    ("404", 404, "Website not found or not accessible"),
+    ("invalid url", 400, "Invalid URL format"),
+    ("failed to fetch", 404, "Unable to fetch website content"),
+)
+
+def classify_error(error_message: str, default_message: str) -> Tuple[int, str]:
+    """Map an exception message to an HTTP status code and user-facing message"""
+    lowered = error_message.lower()
+    return next(
+        ((code, message) for needle, code, message in _ERR_RULES if needle in lowered),
+        (500, default_message)
+    )
 
 class InsightsRequest(BaseModel):
-    website_url: str
+    website_url: HttpUrl
     include_competitor_analysis: bool = True
+    # Competitor stores scraped in parallel during competitor analysis
+    concurrency: int = Field(default=8, ge=1, le=32)
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "website_url": "https://example.myshopify.com",
-                "include_competitor_analysis": True
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "website_url": "https://example.myshopify.com",
+            "include_competitor_analysis": True
         }
+    })
+
+# Static bodies encoded once at import; /health only splices in the timestamp
+_ROOT_BYTES = orjson.dumps({
+    "message": "Shopify Insights Fetcher API",
+    "version": settings.app_version,
+    "docs": "/docs" if settings.debug else None,
+    "health": "/health"
+})
+_HEALTH_PREFIX = b'{"status":"healthy","timestamp":"'
+_HEALTH_SUFFIX = b'","version":' + orjson.dumps(settings.app_version) + b'}'
 
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
-    return {
-        "message": "Shopify Insights Fetcher API",
-        "version": settings.app_version,
-        "docs": "/docs",
-        "health": "/health"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now(),
-        "version": settings.app_version
-    }
+    body = _HEALTH_PREFIX + datetime.now().isoformat().encode() + _HEALTH_SUFFIX
+    return Response(content=body, media_type="application/json")
 
-@app.post("/insights", response_model=SuccessResponse)
-async def fetch_insights(request: InsightsRequest):
-    """
-    Fetch comprehensive insights from a Shopify store with competitor analysis
-    
-    **Parameters:**
-    - **website_url**: The URL of the Shopify store to analyze
-    - **include_competitor_analysis**: Whether to include competitor analysis in the response (default: true)
-    
-    **Returns:**
-    - Complete brand insights including products, policies, social handles, etc.
-    - Includes competitor analysis data by default (can be disabled by setting include_competitor_analysis: false)
-    
-    **Error Codes:**
-    - **400**: Invalid URL format or not a valid website
-    - **404**: Website not found or not accessible
-    - **500**: Internal server error during processing
-    """
+async def _do_insights(url: str, include_competitor_analysis: bool = True,
+                       refresh: bool = False) -> Response:
+    """Shared body of the insights endpoints, taking plain arguments"""
     try:
-        logger.info(f"Received insights request for: {request.website_url}")
+        logger.info("Received insights request for: %s", url)
+        website_url = canonical_url(url)
         
         # Fetch insights using the service
-        insights = await insights_service.fetch_insights(request.website_url)
+        if include_competitor_analysis:
+            # The stored-analysis lookup doesn't depend on the scrape, so run both at once
+            insights, stored_analysis = await asyncio.gather(
+                cached_fetch_insights(website_url, refresh),
+                stored_competitor_analysis(website_url),
+                return_exceptions=True
+            )
+            if isinstance(insights, BaseException):
+                raise insights
+        else:
+            insights = await cached_fetch_insights(website_url, refresh)
+        
+        # Large catalogs are streamed product by product after the rest of
+        # the insights, so the full body is never held in memory at once
+        stream_catalog = len(insights.product_catalog) > STREAM_THRESHOLD
         
-        # Convert insights to dict for potential modification
-        insights_dict = insights.model_dump()
+        # Serialize straight to bytes in pydantic-core; no dict round trip
+        data = _INSIGHTS_ADAPTER.dump_json(
+            insights, exclude={'product_catalog'} if stream_catalog else None
+        )
         
         # Optionally include competitor analysis
-        if request.include_competitor_analysis:
+        if include_competitor_analysis:
             logger.info("Including competitor analysis in response")
             try:
-                # First check if we have stored competitor analysis
-                stored_analysis = db_manager.get_competitor_analysis(request.website_url)
+                if isinstance(stored_analysis, BaseException):
+                    raise stored_analysis
                 
                 if stored_analysis:
                     logger.info("Found stored competitor analysis")
-                    insights_dict['competitor_analysis'] = stored_analysis
+                    competitor_analysis = stored_analysis
                 else:
                     logger.info("No stored competitor analysis found, running new analysis")
-                    # Run competitor analysis
-                    analysis_result = await competitor_analyzer.analyze_competitors(
-                        brand_name=insights_dict.get('brand_name', 'Unknown Brand'),
-                        website_url=request.website_url,
-                        insights_service=insights_service
+                    competitor_analysis = await run_competitor_analysis(
+                        insights.brand_name or 'Unknown Brand',
+                        website_url,
+                        base_insights=insights
                     )
                     
-                    # Save to database
-                    try:
-                        analysis_id = db_manager.save_competitor_analysis(analysis_result)
-                        analysis_result['analysis_id'] = analysis_id
-                        logger.info(f"Saved new competitor analysis with ID: {analysis_id}")
-                    except Exception as e:
-                        logger.error(f"Failed to save competitor analysis: {e}")
-                    
-                    insights_dict['competitor_analysis'] = analysis_result
-                    
             except Exception as e:
-                logger.error(f"Error during competitor analysis: {e}")
-                insights_dict['competitor_analysis'] = {
+                logger.error("Error during competitor analysis: %s", e)
+                competitor_analysis = {
                     "error": "Failed to analyze competitors",
                     "message": str(e)
                 }
+            
+            data = splice_json(data, 'competitor_analysis', orjson.dumps(competitor_analysis, default=orjson_default))
         
-        return custom_json_response({
-            "success": True,
-            "data": insights_dict,
-            "message": f"Successfully extracted insights for {request.website_url}",
-            "timestamp": datetime.now().isoformat()
-        })
+        envelope_fields = dict(
+            success=True,
+            message=f"Successfully extracted insights for {url}",
+            timestamp=datetime.now()
+        )
+        if stream_catalog:
+            products = (_PRODUCT_ADAPTER.dump_json(product) for product in insights.product_catalog)
+            return StreamingResponse(
+                iter_json_envelope_chunks(
+                    iter_splice_json_list(data, 'product_catalog', products),
+                    **envelope_fields
+                ),
+                media_type="application/json"
+            )
+        
+        body = json_envelope(data, **envelope_fields)
+        return Response(content=body, media_type="application/json")
         
     except Exception as e:
         error_message = str(e)
-        logger.error(f"Error processing request for {request.website_url}: {error_message}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Error processing request for %s: %s", url, error_message)
         
         # Determine appropriate status code based on error
-        if "not found" in error_message.lower() or "404" in error_message:
-            status_code = 404
-            message = "Website not found or not accessible"
-        elif "invalid url" in error_message.lower():
-            status_code = 400
-            message = "Invalid URL format"
-        elif "failed to fetch" in error_message.lower():
-            status_code = 404
-            message = "Unable to fetch website content"
-        else:
-            status_code = 500
-            message = "Internal server error occurred while processing the request"
+        status_code, message = classify_error(
+            error_message, "Internal server error occurred while processing the request"
+        )
         
         raise HTTPException(
             status_code=status_code,
@@ -187,11 +335,80 @@ async def fetch_insights(request: InsightsRequest):
                 "error": error_message,
                 "status_code": status_code,
                 "message": message,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now()
             }
         )
 
-@app.get("/stored-insights/{website_url:path}")
+@app.post("/insights", responses={200: {"model": SuccessResponse}})
+async def fetch_insights(request: InsightsRequest, refresh: bool = False):
+    """
+    Fetch comprehensive insights from a Shopify store with competitor analysis
+    
+    **Parameters:**
+    - **website_url**: The URL of the Shopify store to analyze
+    - **include_competitor_analysis**: Whether to include competitor analysis in the response (default: true)
+    - **refresh**: Query parameter; bypass the insights cache and re-scrape the store (default: false)
+    
+    **Returns:**
+    - Complete brand insights including products, policies, social handles, etc.
+    - Includes competitor analysis data by default (can be disabled by setting include_competitor_analysis: false)
+    
+    **Error Codes:**
+    - **400**: Invalid URL format or not a valid website
+    - **404**: Website not found or not accessible
+    - **500**: Internal server error during processing
+    """
+    return await _do_insights(str(request.website_url), request.include_competitor_analysis, refresh)
+
+@app.post("/insights/batch")
+async def fetch_insights_batch(request: BatchInsightsRequest):
+    """
+    Fetch insights for several Shopify stores in one request
+    
+    **Parameters:**
+    - **urls**: The store URLs to analyze
+    - **max_concurrency**: How many stores are scraped at the same time (max 20)
+    
+    **Returns:**
+    - One result per URL, in request order; a failing store gets an error
+      object instead of failing the whole batch
+    """
+    semaphore = asyncio.Semaphore(request.max_concurrency or settings.max_concurrent_stores)
+    
+    async def fetch_one(url: str) -> BrandInsights:
+        async with semaphore:
+            return await cached_fetch_insights(canonical_url(url))
+    
+    urls = [str(url) for url in request.urls]
+    logger.info("Received batch insights request for %s stores", len(urls))
+    results = await asyncio.gather(*(fetch_one(url) for url in urls), return_exceptions=True)
+    
+    data = []
+    for url, result in zip(urls, results):
+        if isinstance(result, BaseException):
+            status_code, message = classify_error(
+                str(result), "Internal server error occurred while processing the request"
+            )
+            data.append({
+                "website_url": url,
+                "success": False,
+                "error": str(result),
+                "status_code": status_code,
+                "message": message
+            })
+        else:
+            data.append({"website_url": url, "success": True, "data": result})
+    
+    succeeded = sum(1 for item in data if item["success"])
+    return ORJSONResponse({
+        "success": True,
+        "data": data,
+        "count": len(data),
+        "message": f"Extracted insights for {succeeded} of {len(data)} stores",
+        "timestamp": datetime.now()
+    })
+
+@app.get("/stored-insights/{website_url:path}", dependencies=[Depends(require_db_storage)])
 async def get_stored_insights(website_url: str):
     """
     Retrieve stored insights for a specific website from the database.
@@ -205,10 +422,11 @@ async def get_stored_insights(website_url: str):
     **Error Codes:**
     - **404**: No insights found for the specified website
     - **500**: Internal server error during retrieval
+    - **503**: Database storage is disabled
     """
     try:
-        logger.info(f"Retrieving stored insights for: {website_url}")
-        insights = db_manager.get_store_insights(website_url)
+        logger.info("Retrieving stored insights for: %s", website_url)
+        insights = await asyncio.to_thread(get_db_manager().get_store_insights, canonical_url(website_url))
         
         if not insights:
             raise HTTPException(
@@ -216,59 +434,85 @@ async def get_stored_insights(website_url: str):
                 detail=f"No insights found for {website_url}"
             )
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "success": True,
                 "data": insights,
                 "message": f"Successfully retrieved insights for {website_url}",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now()
             }
         )
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error retrieving insights for {website_url}: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Error retrieving insights for %s: %s", website_url, e)
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
         )
 
-@app.get("/stores")
-async def list_all_stores():
+@app.get("/stores", dependencies=[Depends(require_db_storage)])
+async def list_all_stores(limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
     """
-    List all stores in the database with basic information.
+    List stores in the database with basic information, most recently updated first.
+    
+    **Parameters:**
+    - **limit**: Maximum number of stores to return (default: 100, max: 1000)
+    - **offset**: Number of stores to skip (default: 0)
     
     **Returns:**
-    - List of all stores with their metadata
+    - One page of stores with their metadata, plus the total store count
     
     **Error Codes:**
     - **500**: Internal server error during retrieval
+    - **503**: Database storage is disabled
     """
     try:
         logger.info("Retrieving all stores from database")
-        stores = db_manager.list_all_stores()
+        db = get_db_manager()
+        stores, total = await asyncio.gather(
+            asyncio.to_thread(db.list_all_stores, limit, offset),
+            asyncio.to_thread(db.count_stores)
+        )
         
-        return JSONResponse(
+        if len(stores) > STREAM_THRESHOLD:
+            # Encode row by row instead of building the whole body in memory
+            return StreamingResponse(
+                iter_json_envelope(
+                    stores,
+                    success=True,
+                    count=len(stores),
+                    total=total,
+                    limit=limit,
+                    offset=offset,
+                    message=f"Successfully retrieved {len(stores)} stores",
+                    timestamp=datetime.now()
+                ),
+                media_type="application/json"
+            )
+        
+        return ORJSONResponse(
             status_code=200,
             content={
                 "success": True,
                 "data": stores,
                 "count": len(stores),
+                "total": total,
+                "limit": limit,
+                "offset": offset,
                 "message": f"Successfully retrieved {len(stores)} stores",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now()
             }
         )
     except Exception as e:
-        logger.error(f"Error listing stores: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Error listing stores: %s", e)
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
         )
 
-@app.delete("/stored-insights/{website_url:path}")
+@app.delete("/stored-insights/{website_url:path}", dependencies=[Depends(require_db_storage)])
 async def delete_stored_insights(website_url: str):
     """
     Delete stored insights for a specific website from the database.
@@ -282,10 +526,11 @@ async def delete_stored_insights(website_url: str):
     **Error Codes:**
     - **404**: No insights found for the specified website
     - **500**: Internal server error during deletion
+    - **503**: Database storage is disabled
     """
     try:
-        logger.info(f"Deleting stored insights for: {website_url}")
-        success = db_manager.delete_store_insights(website_url)
+        logger.info("Deleting stored insights for: %s", website_url)
+        success = await asyncio.to_thread(get_db_manager().delete_store_insights, canonical_url(website_url))
         
         if not success:
             raise HTTPException(
@@ -293,41 +538,56 @@ async def delete_stored_insights(website_url: str):
                 detail=f"No insights found for {website_url}"
             )
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "success": True,
                 "message": f"Successfully deleted insights for {website_url}",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now()
             }
         )
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting insights for {website_url}: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Error deleting insights for %s: %s", website_url, e)
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
         )
 
-@app.get("/insights/{website_url:path}", response_model=SuccessResponse)
-async def fetch_insights_get(website_url: str):
+@app.get("/insights/{website_url:path}", responses={200: {"model": SuccessResponse}})
+async def fetch_insights_get(website_url: str, refresh: bool = False):
     """
     Alternative GET endpoint for fetching insights (for easy testing)
     
     **Parameters:**
     - **website_url**: The URL of the Shopify store to analyze (URL encoded)
+    - **refresh**: Bypass the insights cache and re-scrape the store (default: false)
     
     **Returns:**
     - Complete brand insights including products, policies, social handles, etc.
     """
-    # Create request object and use the POST endpoint logic
-    request = InsightsRequest(website_url=website_url)
-    return await fetch_insights(request)
+    return await _do_insights(website_url, refresh=refresh)
+
+async def run_insights_task(task_id: str, website_url: str) -> None:
+    """Scrape website_url for /insights/async and record the outcome under task_id"""
+    try:
+        insights = await cached_fetch_insights(website_url)
+    except asyncio.CancelledError:
+        logger.warning("Background task %s was cancelled", task_id)
+        await insights_cache.set_task_status(task_id, {"status": "cancelled"})
+        raise
+    except Exception as e:
+        logger.error("Background task %s failed: %s", task_id, e)
+        await insights_cache.set_task_status(task_id, {"status": "failure", "error": str(e)})
+    else:
+        logger.info("Background task %s completed for %s", task_id, website_url)
+        await insights_cache.set_task_status(
+            task_id, {"status": "success", "data": insights.model_dump(mode='json')}
+        )
 
 @app.post("/insights/async")
-async def fetch_insights_async(request: InsightsRequest, background_tasks: BackgroundTasks):
+async def fetch_insights_async(request: InsightsRequest):
     """
     Asynchronous endpoint for large stores (returns immediately with task ID)
     
@@ -335,38 +595,77 @@ async def fetch_insights_async(request: InsightsRequest, background_tasks: Backg
     - **website_url**: The URL of the Shopify store to analyze
     
     **Returns:**
-    - Task ID for checking status later
+    - Task ID for checking status later at /insights/status/{task_id}
     
-    **Note:** This is a placeholder for future implementation with task queues
+    **Note:** With BROKER_URL configured the scrape runs on a Celery worker;
+    otherwise it runs in-process on the app's event loop. With more than one
+    worker process, set REDIS_URL so whichever worker receives a status poll
+    can report the task; without it polls landing on another worker get 404.
     """
-    task_id = f"task_{datetime.now().timestamp()}"
-    
-    def process_insights():
-        # This would typically be handled by a task queue like Celery
-        loop = None
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            insights = loop.run_until_complete(insights_service.fetch_insights(request.website_url))
-            # Store results in database/cache with task_id
-            logger.info(f"Background task {task_id} completed for {request.website_url}")
-        except Exception as e:
-            logger.error(f"Background task {task_id} failed: {str(e)}")
-        finally:
-            if loop:
-                loop.close()
-    
-    background_tasks.add_task(process_insights)
+    if celery_app is not None:
+        # delay() talks to the broker synchronously, so keep it off the event loop
+        async_result = await asyncio.to_thread(
+            scrape_insights_task.delay, canonical_url(str(request.website_url))
+        )
+        return {
+            "task_id": async_result.id,
+            "status": "queued",
+            "message": "Insights extraction queued",
+            "website_url": str(request.website_url),
+            "estimated_time": "2-5 minutes"
+        }
+    
+    task_id = f"task_{uuid4().hex}"
+    await insights_cache.set_task_status(task_id, {"status": "processing"})
+    
+    # Scheduled straight on the app's event loop, sharing the HTTP session
+    task = asyncio.create_task(run_insights_task(task_id, canonical_url(str(request.website_url))))
+    _running_tasks[task_id] = task
+    task.add_done_callback(lambda _: _running_tasks.pop(task_id, None))
     
     return {
         "task_id": task_id,
         "status": "processing",
         "message": "Insights extraction started in background",
-        "website_url": request.website_url,
+        "website_url": str(request.website_url),
         "estimated_time": "2-5 minutes"
     }
 
-@app.post("/test")
+@app.get("/insights/status/{task_id}")
+async def get_insights_task_status(task_id: str):
+    """
+    Check the status of a task started with /insights/async
+    
+    **Parameters:**
+    - **task_id**: The task ID returned by /insights/async
+    
+    **Returns:**
+    - Task state, and the insights once the task has finished
+    
+    **Error Codes:**
+    - **404**: Unknown or expired task ID, or an in-process task started by
+      another worker process while REDIS_URL is unset
+    """
+    if task_id in _running_tasks:
+        return {"task_id": task_id, "status": "processing"}
+    status = await insights_cache.get_task_status(task_id)
+    if status is not None:
+        return {"task_id": task_id, **status}
+    
+    if celery_app is None:
+        raise HTTPException(status_code=404, detail=f"Unknown task {task_id}")
+    
+    result = AsyncResult(task_id, app=celery_app)
+    # Reading state/result queries the result backend, which is blocking I/O
+    state = await asyncio.to_thread(lambda: result.state)
+    content = {"task_id": task_id, "status": state.lower()}
+    if state == "SUCCESS":
+        content["data"] = await asyncio.to_thread(lambda: result.result)
+    elif state == "FAILURE":
+        content["error"] = str(await asyncio.to_thread(lambda: result.result))
+    return content
+
+@app.post("/test", responses={200: {"model": SuccessResponse}})
 async def test_scraping():
     """Test endpoint to verify scraping functionality with a simple example"""
     try:
@@ -405,27 +704,28 @@ async def test_scraping():
             phone_numbers=["+1-555-0123"]
         )
         
-        return SuccessResponse(
+        response = SuccessResponse(
             data=mock_insights,
             message="Test data generated successfully - scraping functionality is working"
         )
+        return Response(content=_SUCCESS_ADAPTER.dump_json(response), media_type="application/json")
         
     except Exception as e:
-        logger.error(f"Test endpoint error: {str(e)}")
+        logger.error("Test endpoint error: %s", e)
         raise HTTPException(
             status_code=500,
             detail={
                 "error": str(e),
                 "status_code": 500,
                 "message": "Test endpoint failed",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now()
             }
         )
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Custom HTTP exception handler"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content=exc.detail
     )
@@ -433,87 +733,51 @@ async def http_exception_handler(request, exc):
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """General exception handler for unhandled errors"""
-    logger.error(f"Unhandled exception: {str(exc)}")
-    logger.error(f"Traceback: {traceback.format_exc()}")
+    logger.exception("Unhandled exception: %s", exc, exc_info=exc)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
             "status_code": 500,
             "message": "An unexpected error occurred while processing your request",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now()
         }
     )
 
-@app.post("/competitor-analysis")
-async def analyze_competitors(request: InsightsRequest):
-    """
-    Analyze competitors for a given brand and extract insights from their Shopify stores.
-    
-    **Parameters:**
-    - **website_url**: The URL of the brand to analyze competitors for
-    
-    **Returns:**
-    - Competitor analysis with insights from competitor Shopify stores
-    
-    **Error Codes:**
-    - **400**: Invalid URL format or not a valid website
-    - **404**: Website not found or not accessible
-    - **500**: Internal server error during processing
-    """
+async def _do_competitor_analysis(url: str, concurrency: int = 8) -> ORJSONResponse:
+    """Shared body of the competitor-analysis endpoints, taking plain arguments"""
     try:
-        logger.info(f"Starting competitor analysis for: {request.website_url}")
+        logger.info("Starting competitor analysis for: %s", url)
+        website_url = canonical_url(url)
         
         # First get insights for the original brand
-        original_insights = await insights_service.fetch_insights(request.website_url)
+        original_insights = await cached_fetch_insights(website_url)
         brand_name = original_insights.brand_name or "Unknown Brand"
         
-        # Analyze competitors
-        analysis_result = await competitor_analyzer.analyze_competitors(
-            brand_name, 
-            request.website_url, 
-            insights_service
+        # Analyze competitors and save the result
+        analysis_result = await run_competitor_analysis(
+            brand_name, website_url, base_insights=original_insights, concurrency=concurrency
         )
         
-        # Save competitor analysis to database
-        try:
-            logger.info("Saving competitor analysis to database")
-            analysis_id = db_manager.save_competitor_analysis(analysis_result)
-            logger.info(f"Successfully saved competitor analysis with ID: {analysis_id}")
-            analysis_result['analysis_id'] = analysis_id
-        except Exception as e:
-            logger.error(f"Failed to save competitor analysis to database: {e}")
-            # Continue without failing the request
-        
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "success": True,
                 "data": analysis_result,
                 "message": f"Successfully analyzed competitors for {brand_name}",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now()
             }
         )
         
     except Exception as e:
         error_message = str(e)
-        logger.error(f"Error during competitor analysis for {request.website_url}: {error_message}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Error during competitor analysis for %s: %s", url, error_message)
         
         # Determine appropriate status code based on error
-        if "not found" in error_message.lower() or "404" in error_message:
-            status_code = 404
-            message = "Website not found or not accessible"
-        elif "invalid url" in error_message.lower():
-            status_code = 400
-            message = "Invalid URL format"
-        elif "failed to fetch" in error_message.lower():
-            status_code = 404
-            message = "Unable to fetch website content"
-        else:
-            status_code = 500
-            message = "Internal server error occurred during competitor analysis"
+        status_code, message = classify_error(
+            error_message, "Internal server error occurred during competitor analysis"
+        )
         
         raise HTTPException(
             status_code=status_code,
@@ -521,10 +785,28 @@ async def analyze_competitors(request: InsightsRequest):
                 "error": error_message,
                 "status_code": status_code,
                 "message": message,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now()
             }
         )
 
+@app.post("/competitor-analysis")
+async def analyze_competitors(request: InsightsRequest):
+    """
+    Analyze competitors for a given brand and extract insights from their Shopify stores.
+    
+    **Parameters:**
+    - **website_url**: The URL of the brand to analyze competitors for
+    
+    **Returns:**
+    - Competitor analysis with insights from competitor Shopify stores
+    
+    **Error Codes:**
+    - **400**: Invalid URL format or not a valid website
+    - **404**: Website not found or not accessible
+    - **500**: Internal server error during processing
+    """
+    return await _do_competitor_analysis(str(request.website_url), request.concurrency)
+
 @app.get("/competitor-analysis/{website_url:path}")
 async def analyze_competitors_get(website_url: str):
     """
@@ -536,10 +818,9 @@ async def analyze_competitors_get(website_url: str):
     **Returns:**
     - Competitor analysis with insights from competitor Shopify stores
     """
-    request = InsightsRequest(website_url=website_url)
-    return await analyze_competitors(request)
+    return await _do_competitor_analysis(website_url)
 
-@app.get("/stored-competitor-analysis/{website_url:path}")
+@app.get("/stored-competitor-analysis/{website_url:path}", dependencies=[Depends(require_db_storage)])
 async def get_stored_competitor_analysis(website_url: str):
     """
     Retrieve stored competitor analysis for a specific website from the database.
@@ -553,10 +834,11 @@ async def get_stored_competitor_analysis(website_url: str):
     **Error Codes:**
     - **404**: No competitor analysis found for the specified website
     - **500**: Internal server error during retrieval
+    - **503**: Database storage is disabled
     """
     try:
-        logger.info(f"Retrieving stored competitor analysis for: {website_url}")
-        analysis = db_manager.get_competitor_analysis(website_url)
+        logger.info("Retrieving stored competitor analysis for: %s", website_url)
+        analysis = await asyncio.to_thread(get_db_manager().get_competitor_analysis, canonical_url(website_url))
         
         if not analysis:
             raise HTTPException(
@@ -564,20 +846,19 @@ async def get_stored_competitor_analysis(website_url: str):
                 detail=f"No competitor analysis found for {website_url}"
             )
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "success": True,
                 "data": analysis,
                 "message": f"Successfully retrieved competitor analysis for {website_url}",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now()
             }
         )
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error retrieving competitor analysis for {website_url}: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Error retrieving competitor analysis for %s: %s", website_url, e)
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
@@ -600,18 +881,14 @@ async def comprehensive_analysis(request: InsightsRequest):
     - **500**: Internal server error during processing
     """
     try:
-        logger.info(f"Starting comprehensive analysis for: {request.website_url}")
+        logger.info("Starting comprehensive analysis for: %s", request.website_url)
         
-        # Force include competitor analysis
-        request.include_competitor_analysis = True
-        
-        # Use the existing insights endpoint with competitor analysis
-        return await fetch_insights(request)
+        # Use the shared insights logic with competitor analysis forced on
+        return await _do_insights(str(request.website_url), include_competitor_analysis=True)
         
     except Exception as e:
         error_message = str(e)
-        logger.error(f"Error during comprehensive analysis for {request.website_url}: {error_message}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Error during comprehensive analysis for %s: %s", request.website_url, error_message)
         
         raise HTTPException(
             status_code=500,
@@ -619,16 +896,29 @@ async def comprehensive_analysis(request: InsightsRequest):
                 "error": error_message,
                 "status_code": 500,
                 "message": "Internal server error during comprehensive analysis",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now()
             }
         )
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
+    # uvicorn runs a single process when reloading, whatever workers says
+    if settings.workers > 1 and not settings.debug and not (settings.broker_url or settings.redis_url):
+        logger.warning(
+            "Running %d workers without BROKER_URL or REDIS_URL: /insights/status polls "
+            "only find in-process tasks started by the same worker", settings.workers
+        )
     uvicorn.run(
         "main:app",
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
-        log_level=settings.log_level.lower()
+        workers=settings.workers,
+        # uvloop has no Windows build; uvicorn[standard] only installs it elsewhere
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
+        log_level=settings.log_level.lower(),
+        # Requests are already logged by the handlers; keep the access log for debugging
+        access_log=settings.debug
     )
\ No newline at end of file
@@ -1,16 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from bs4 import BeautifulSoup, Tag
 from bs4.element import NavigableString
-import json
+import orjson
 import re
 import logging
+import weakref
 from urllib.parse import urljoin, urlparse
 from core.models import ProductModel, SocialHandles, ContactDetails, PolicyModel, FAQModel, ImportantLinks
 from core.utils import WebScraper, ShopifyDetector, URLUtils, TextCleaner
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax wheels are not published for every platform
+    LexborHTMLParser = None
+
 logger = logging.getLogger(__name__)
 
+# Parsed JSON-LD per soup, shared by every extractor run over the same page.
+# Keyed by id() because Tag.__hash__ serializes the whole document; entries
+# are dropped by a finalizer when the soup is garbage collected.
+_json_ld_cache: Dict[int, List[Dict]] = {}
+
 def safe_get_attr(element, attr: str, default: str = '') -> str:
     """Safely get attribute from BeautifulSoup element"""
     if hasattr(element, 'get'):
@@ -39,9 +50,11 @@ def safe_find(element, *args, **kwargs):
 class BaseExtractor(ABC):
     """Abstract base class for data extractors"""
     
-    def __init__(self, soup: BeautifulSoup, base_url: str):
+    def __init__(self, soup: BeautifulSoup, base_url: str, html: Optional[Union[str, bytes]] = None):
         self.soup = soup
         self.base_url = base_url
+        # Raw page, when available, lets structured-data lookups use the C parser
+        self.html = html
         self.domain = URLUtils.get_domain(base_url)
     
     @abstractmethod
@@ -60,18 +73,30 @@ class BaseExtractor(ABC):
         return urljoin(self.base_url, url)
     
     def _extract_json_ld(self) -> List[Dict]:
-        """Extract JSON-LD structured data"""
-        json_ld_scripts = safe_find_all(self.soup, 'script', {'type': 'application/ld+json'})
+        """Extract JSON-LD structured data, parsed once per page"""
+        key = id(self.soup)
+        cached = _json_ld_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if self.html and LexborHTMLParser is not None:
+            script_texts = (node.text() for node in
+                            LexborHTMLParser(self.html).css('script[type="application/ld+json"]'))
+        else:
+            script_texts = (safe_get_text(script) for script in
+                            safe_find_all(self.soup, 'script', {'type': 'application/ld+json'}))
         structured_data = []
         
-        for script in json_ld_scripts:
+        for script_text in script_texts:
             try:
-                data = json.loads(safe_get_text(script))
+                data = orjson.loads(script_text)
                 if isinstance(data, list):
                     structured_data.extend(data)
                 else:
                     structured_data.append(data)
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 continue
         
+        _json_ld_cache[key] = structured_data
+        weakref.finalize(self.soup, _json_ld_cache.pop, key, None)
         return structured_data
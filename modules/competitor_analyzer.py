@@ -1,23 +1,270 @@
-import requests
+import asyncio
+from collections import Counter
+from functools import lru_cache
+import aiohttp
 import re
-from typing import List, Dict, Optional, Any
-from bs4 import BeautifulSoup
+from typing import AsyncIterator, Sequence, List, Dict, Optional, Any, Tuple
+from bs4 import SoupStrainer
+from cachetools import TTLCache
 from urllib.parse import urlparse, urljoin, quote_plus
-import time
+import html
 import logging
 import json
-import random
+
+from core.models import BrandInsights
+from core.utils import HostRateLimiter, get_shared_session, parse_html
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Category keywords, in priority order when a page matches several categories
+BRAND_CATEGORIES = {
+    "fashion": ["fashion", "clothing", "apparel", "style", "wear", "dress", "shirt"],
+    "beauty": ["beauty", "cosmetics", "skincare", "makeup", "fragrance", "perfume"],
+    "fitness": ["fitness", "gym", "workout", "supplement", "protein", "nutrition"],
+    "gaming": ["gaming", "gamer", "esports", "energy drink", "gfuel"],
+    "electronics": ["electronics", "tech", "gadget", "device", "smartphone"],
+    "home": ["home", "furniture", "decor", "kitchen", "living"],
+    "jewelry": ["jewelry", "watch", "ring", "necklace", "bracelet"],
+    "sports": ["sports", "athletic", "outdoor", "running", "basketball"],
+    "food": ["food", "snack", "drink", "beverage", "organic"],
+    "pet": ["pet", "dog", "cat", "animal", "puppy"]
+}
+# All keywords in one pattern, one named group per category. The lookahead
+# makes matches zero-width so a keyword inside another one is still found
+# ("wear" in "sportswear"), matching the old substring checks.
+_CATEGORY_RE = re.compile('(?=' + '|'.join(
+    f"(?P<{category}>{'|'.join(map(re.escape, keywords))})"
+    for category, keywords in BRAND_CATEGORIES.items()
+) + ')')
+
+# Concurrent requests allowed to one search engine or candidate store
+SEARCH_CONCURRENCY_PER_HOST = 8
+# Long enough for a pooled connection to actually return a page
+SEARCH_TIMEOUT = 5
+# Retries for connection failures, with 0.3s, 0.6s, ... backoff
+SEARCH_RETRIES = 2
+# Minimum seconds between two requests to the same search engine
+SEARCH_ENGINE_INTERVAL = 0.5
+# Bytes of the brand's homepage read to find its title and meta description
+CATEGORY_PROBE_BYTES = 8192
+# Shopify markers sit in the <head>, so only this much of a candidate page is read
+SHOPIFY_PROBE_BYTES = 16384
+# Markers of a Shopify storefront in raw page bytes. Every former indicator
+# (cdn.shopify.com, myshopify.com, shopify-analytics, shopify.theme, ...) other
+# than shop_id contains "shopify", so the two alternatives cover them all
+_SHOPIFY_MARKER_RE = re.compile(rb'shopify|shop_id', re.IGNORECASE)
+
+# Search result pages are parsed for their result anchors only
+_DDG_RESULT_STRAINER = SoupStrainer('a', class_='result__a')
+_STARTPAGE_RESULT_STRAINER = SoupStrainer('a', class_='w-gl__result-title')
+_LINK_STRAINER = SoupStrainer('a', href=True)
+
+# Result anchors matched straight on the response bytes; the strainers above
+# are only used when these find nothing (i.e. the engine changed its markup)
+_DDG_RESULT_TAG_RE = re.compile(rb'<a\s[^>]*\bclass="[^"]*\bresult__a\b[^"]*"[^>]*>', re.IGNORECASE)
+_STARTPAGE_RESULT_TAG_RE = re.compile(
+    rb'<a\s[^>]*\bclass="[^"]*\bw-gl__result-title\b[^"]*"[^>]*>', re.IGNORECASE
+)
+_HREF_RE = re.compile(rb'\bhref="([^"]+)"', re.IGNORECASE)
+
+def _result_links(content: bytes, tag_re: "re.Pattern[bytes]", strainer: SoupStrainer,
+                  css_class: str, limit: int = 15) -> List[str]:
+    """Absolute hrefs of the first `limit` search result anchors on a page"""
+    hrefs = []
+    for tag in tag_re.finditer(content):
+        if len(hrefs) == limit:
+            break
+        match = _HREF_RE.search(tag.group(0))
+        if match:
+            hrefs.append(html.unescape(match.group(1).decode('utf-8', errors='ignore')))
+    
+    if not hrefs:
+        soup = parse_html(content, parse_only=strainer)
+        hrefs = [link.get('href') for link in soup.find_all('a', class_=css_class)[:limit]]
+    
+    return [href for href in hrefs if href and isinstance(href, str) and href.startswith('http')]
+
+# Search query templates, formatted with brand, category and domain
+_WEB_QUERY_TEMPLATES = (
+    "{category} brands like {brand}",
+    "best {category} websites",
+    "{category} alternatives to {brand}",
+    "top {category} stores online",
+    "{brand} competitors",
+    "{category} ecommerce sites",
+    "similar to {brand}",
+    "{category} online shopping",
+    "best {category} brands 2024",
+    "{category} marketplace stores"
+)
+_SIMILAR_QUERY_TEMPLATES = (
+    "sites like {domain}",
+    "websites similar to {domain}",
+    "alternatives to {domain}",
+    "{brand} similar websites"
+)
+# Industry-specific competitor databases and directories
+_INDUSTRY_QUERY_TEMPLATES: Dict[str, Tuple[str, ...]] = {
+    "gaming": (
+        "gaming supplement brands",
+        "esports energy drinks",
+        "gamer nutrition companies",
+        "gaming lifestyle brands"
+    ),
+    "fashion": (
+        "fashion ecommerce brands",
+        "clothing online stores",
+        "fashion retailers",
+        "apparel brands"
+    ),
+    "beauty": (
+        "beauty ecommerce sites",
+        "cosmetics brands online",
+        "skincare companies",
+        "makeup retailers"
+    ),
+    "fitness": (
+        "fitness supplement brands",
+        "workout nutrition companies",
+        "fitness apparel stores",
+        "health supplement retailers"
+    ),
+    "default": (
+        "{category} online brands",
+        "{category} ecommerce companies",
+        "{category} retail stores",
+        "{category} direct to consumer brands"
+    )
+}
+
+# Popular Shopify stores by category, used when search finds no competitors
+_FALLBACK_STORES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "gaming": (
+        ("Razer", "https://www.razer.com"),
+        ("SteelSeries", "https://steelseries.com"),
+        ("HyperX", "https://www.hyperxgaming.com"),
+        ("Corsair", "https://www.corsair.com")
+    ),
+    "fashion": (
+        ("Allbirds", "https://www.allbirds.com"),
+        ("Everlane", "https://www.everlane.com"),
+        ("Bombas", "https://bombas.com"),
+        ("Outdoor Voices", "https://outdoorvoices.com")
+    ),
+    "beauty": (
+        ("Glossier", "https://www.glossier.com"),
+        ("ColourPop", "https://colourpop.com"),
+        ("Fenty Beauty", "https://fentybeauty.com"),
+        ("Kylie Cosmetics", "https://kyliecosmetics.com")
+    ),
+    "fitness": (
+        ("Gymshark", "https://www.gymshark.com"),
+        ("Lululemon", "https://shop.lululemon.com"),
+        ("Alo Yoga", "https://www.aloyoga.com"),
+        ("Athletic Greens", "https://athleticgreens.com")
+    ),
+    "default": (
+        ("Allbirds", "https://www.allbirds.com"),
+        ("ColourPop", "https://colourpop.com"),
+        ("Gymshark", "https://www.gymshark.com"),
+        ("Bombas", "https://bombas.com")
+    )
+}
+
+_NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9]')
+
+# Head-of-page patterns used for brand categorization
+_TITLE_RE = re.compile(rb'<title[^>]*>([^<]*)', re.IGNORECASE)
+_META_DESCRIPTION_TAG_RE = re.compile(rb'<meta\s[^>]*\bname=["\']?description["\'\s/>][^>]*>?', re.IGNORECASE)
+_CONTENT_ATTR_RE = re.compile(rb'\bcontent=(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+
+# Public suffixes with two labels, under which stores register their own
+# names (brand.co.uk). Not the full Public Suffix List, just the common ones.
+_MULTI_PART_SUFFIXES = frozenset([
+    'co.uk', 'org.uk', 'me.uk', 'ltd.uk', 'plc.uk', 'ac.uk', 'gov.uk',
+    'com.au', 'net.au', 'org.au', 'edu.au', 'gov.au',
+    'co.nz', 'net.nz', 'org.nz',
+    'co.in', 'net.in', 'org.in', 'firm.in', 'gen.in', 'ind.in',
+    'co.jp', 'ne.jp', 'or.jp', 'ac.jp',
+    'co.kr', 'co.il', 'co.id', 'co.th', 'co.za',
+    'com.br', 'net.br', 'org.br', 'com.mx', 'com.ar', 'com.co',
+    'com.cn', 'net.cn', 'org.cn', 'com.hk', 'com.tw', 'com.sg', 'com.my',
+    'com.ph', 'com.pk', 'com.vn', 'com.tr', 'com.sa', 'com.eg', 'com.ua'
+])
+
+def _registrable_domain(netloc: str) -> str:
+    """Registrable part of a host, e.g. shop.example.com -> example.com and
+    shop.brand.co.uk -> brand.co.uk"""
+    host = netloc.lower().rpartition('@')[2].partition(':')[0].rstrip('.')
+    labels = host.rsplit('.', 3)
+    if len(labels) >= 3 and '.'.join(labels[-2:]) in _MULTI_PART_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+@lru_cache(maxsize=1024)
+def _format_queries(templates: Tuple[str, ...], brand: str, category: str = "", domain: str = "") -> Tuple[str, ...]:
+    """Fill the query templates in; repeat analyses of a brand reuse the result"""
+    return tuple(template.format(brand=brand, category=category, domain=domain) for template in templates)
+
+@lru_cache(maxsize=256)
+def _original_netloc(original_url: str) -> str:
+    """Host of the analyzed site; every candidate is compared against it, so it is parsed once"""
+    return urlparse(original_url).netloc
+
+async def _merge_streams(streams: Dict[str, AsyncIterator[Any]]) -> AsyncIterator[Tuple[str, Any]]:
+    """Yield (name, item) pairs from several async iterators as the items arrive.
+    
+    Closing the merged stream cancels the iterators that are still running.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+    
+    async def pump(name: str, stream: AsyncIterator[Any]) -> None:
+        try:
+            async for item in stream:
+                queue.put_nowait((name, item))
+        except Exception as e:
+            logger.warning(f"{name} failed: {e}")
+        finally:
+            queue.put_nowait((name, finished))
+    
+    tasks = [asyncio.ensure_future(pump(name, stream)) for name, stream in streams.items()]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            name, item = await queue.get()
+            if item is finished:
+                remaining -= 1
+                continue
+            yield name, item
+    finally:
+        for task in tasks:
+            task.cancel()
+
 class CompetitorAnalyzer:
     """Analyze competitors for a given brand and extract insights from Shopify stores."""
     
+    # Non-commercial sites that show up in search results
+    EXCLUDED_DOMAINS = frozenset([
+        'google.com', 'facebook.com', 'instagram.com', 'twitter.com',
+        'youtube.com', 'wikipedia.org', 'amazon.com', 'ebay.com',
+        'linkedin.com', 'reddit.com', 'pinterest.com'
+    ])
+    # Their names, so country sites such as amazon.com.au or google.co.uk match too
+    EXCLUDED_NAMES = frozenset(domain.split('.', 1)[0] for domain in EXCLUDED_DOMAINS)
+    
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
-        })
+        }
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Spaces out requests to each search engine, independently of the others
+        self._rate_limiter = HostRateLimiter(rate=1.0 / SEARCH_ENGINE_INTERVAL)
+        # Shopify verdicts per host, plus checks still in flight so concurrent
+        # strategies that surface the same store share one verification
+        self._shopify_cache: TTLCache = TTLCache(maxsize=4096, ttl=settings.cache_ttl)
+        self._shopify_checks: Dict[str, asyncio.Task] = {}
         
         # Known competitor directories and databases
         self.competitor_sources = [
@@ -26,35 +273,96 @@ class CompetitorAnalyzer:
             self._search_industry_specific
         ]
         
-    def find_competitors(self, brand_name: str, website_url: str, max_competitors: int = 10) -> List[Dict[str, str]]:
+    async def _fetch(self, url: str, timeout: float = SEARCH_TIMEOUT,
+                     headers: Optional[Dict[str, str]] = None, method: str = 'GET',
+                     max_bytes: Optional[int] = None, paced: bool = False) -> Tuple[bytes, Any]:
+        """Request url through the shared aiohttp session; returns the body and response headers.
+        
+        With max_bytes set, at most that many body bytes are read and the rest of
+        the response is discarded. paced requests wait for the host's token bucket,
+        which only ever delays requests to that same host.
+        """
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(SEARCH_CONCURRENCY_PER_HOST)
+        
+        session = await get_shared_session()
+        for attempt in range(SEARCH_RETRIES + 1):
+            try:
+                async with semaphore:
+                    if paced:
+                        await self._rate_limiter.acquire(host)
+                    async with session.request(
+                        method,
+                        url,
+                        headers=headers or self.headers,
+                        timeout=aiohttp.ClientTimeout(total=timeout),
+                        allow_redirects=True
+                    ) as response:
+                        if paced:
+                            self._rate_limiter.update(host, response.headers)
+                        if max_bytes is None:
+                            return await response.read(), response.headers
+                        
+                        body = bytearray()
+                        while len(body) < max_bytes:
+                            chunk = await response.content.read(max_bytes - len(body))
+                            if not chunk:
+                                break
+                            body += chunk
+                        return bytes(body), response.headers
+            except aiohttp.ClientConnectionError:
+                if attempt == SEARCH_RETRIES:
+                    raise
+                await asyncio.sleep(0.3 * 2 ** attempt)
+    
+    async def find_competitors(self, brand_name: str, website_url: str, max_competitors: int = 10,
+                               base_insights: Optional[BrandInsights] = None) -> List[Dict[str, str]]:
         """Find competitors for a given brand using multiple search strategies."""
         logger.info(f"Finding competitors for {brand_name} ({website_url})")
         competitors = []
         
-        # Extract brand category/industry from website
-        category = self._extract_brand_category(website_url)
+        # Extract brand category/industry, reusing already-scraped insights when given
+        if base_insights is not None:
+            category = self._categorize_brand(self._category_text_from_insights(base_insights))
+        else:
+            category = await self._extract_brand_category(website_url)
         logger.info(f"Detected category: {category}")
         
-        # Use multiple search strategies
-        all_competitors = []
-        
-        # Strategy 1: Web search with various queries
-        web_competitors = self._search_web(brand_name, category, website_url)
-        all_competitors.extend(web_competitors)
-        logger.info(f"Found {len(web_competitors)} competitors from web search")
-        
-        # Strategy 2: Search for similar sites
-        similar_competitors = self._search_similar_sites(brand_name, website_url)
-        all_competitors.extend(similar_competitors)
-        logger.info(f"Found {len(similar_competitors)} competitors from similar sites search")
+        # Use multiple search strategies, all running at once: web search with
+        # various queries, similar-site search and industry-specific search.
+        # The strategies share one table of searches so a query that several of
+        # them generate is only sent once per call.
+        # Results are consumed as each query finishes, and the remaining
+        # searches are cancelled once enough distinct stores have been found.
+        searches: Dict[str, asyncio.Task] = {}
+        found = {"web search": 0, "similar sites search": 0, "industry search": 0}
+        seen_domains = set()
+        unique_competitors = []
         
-        # Strategy 3: Industry-specific search
-        industry_competitors = self._search_industry_specific(category, brand_name, website_url)
-        all_competitors.extend(industry_competitors)
-        logger.info(f"Found {len(industry_competitors)} competitors from industry search")
+        stream = _merge_streams({
+            "web search": self._search_web(brand_name, category, website_url, searches),
+            "similar sites search": self._search_similar_sites(brand_name, website_url, searches),
+            "industry search": self._search_industry_specific(category, brand_name, website_url, searches)
+        })
+        try:
+            async for label, results in stream:
+                found[label] += len(results)
+                # Remove duplicates and filter valid Shopify stores as they arrive
+                unique_competitors.extend(
+                    self._deduplicate_and_validate_competitors(results, website_url, seen_domains)
+                )
+                if len(unique_competitors) >= max_competitors:
+                    logger.info(f"Found {max_competitors} competitors, stopping remaining searches")
+                    break
+        finally:
+            await stream.aclose()
+            for task in searches.values():
+                task.cancel()
         
-        # Remove duplicates and filter valid Shopify stores
-        unique_competitors = self._deduplicate_and_validate_competitors(all_competitors, website_url)
+        for label, count in found.items():
+            logger.info(f"Found {count} competitors from {label}")
         
         # Fallback: If no competitors found, add some popular Shopify stores from the same category
         if len(unique_competitors) == 0:
@@ -65,31 +373,24 @@ class CompetitorAnalyzer:
         logger.info(f"Total unique competitors found: {len(unique_competitors)}")
         return unique_competitors[:max_competitors]
     
-    def _extract_brand_category(self, website_url: str) -> str:
+    async def _extract_brand_category(self, website_url: str) -> str:
         """Extract brand category/industry from website content."""
         try:
-            response = requests.get(website_url, timeout=1)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Look for category indicators in meta tags, title, or content
-            meta_description = soup.find('meta', attrs={'name': 'description'})
-            title = soup.find('title')
-            
-            text_content = ""
-            if meta_description:
-                try:
-                    content = meta_description.get('content')  # type: ignore
-                    if content:
-                        text_content += str(content) + " "
-                except:
-                    pass
+            # The title and meta description live in the <head>, so only the
+            # start of the page is read and no DOM is built
+            content, _ = await self._fetch(website_url, max_bytes=CATEGORY_PROBE_BYTES)
+            
+            # Look for category indicators in the meta description and title
+            text_parts = []
+            meta_tag = _META_DESCRIPTION_TAG_RE.search(content)
+            if meta_tag:
+                meta_content = _CONTENT_ATTR_RE.search(meta_tag.group(0))
+                if meta_content:
+                    text_parts.append(meta_content.group(2))
+            title = _TITLE_RE.search(content)
             if title:
-                text_content += title.get_text() + " "
-            
-            # Extract first few paragraphs for context
-            paragraphs = soup.find_all('p')[:3]
-            for p in paragraphs:
-                text_content += p.get_text() + " "
+                text_parts.append(title.group(1))
+            text_content = html.unescape(b' '.join(text_parts).decode('utf-8', errors='ignore'))
             
             # Identify category keywords
             category = self._categorize_brand(text_content)
@@ -99,190 +400,88 @@ class CompetitorAnalyzer:
             logger.warning(f"Could not extract category from {website_url}: {e}")
             return "ecommerce"
     
+    def _category_text_from_insights(self, insights: BrandInsights) -> str:
+        """Build the categorization text from scraped insights instead of refetching the page."""
+        parts = [insights.brand_name or "", insights.brand_description or ""]
+        parts.extend(product.name for product in insights.hero_products[:3])
+        return " ".join(parts)
+    
     def _categorize_brand(self, text_content: str) -> str:
         """Categorize brand based on text content."""
-        text_lower = text_content.lower()
-        
-        categories = {
-            "fashion": ["fashion", "clothing", "apparel", "style", "wear", "dress", "shirt"],
-            "beauty": ["beauty", "cosmetics", "skincare", "makeup", "fragrance", "perfume"],
-            "fitness": ["fitness", "gym", "workout", "supplement", "protein", "nutrition"],
-            "gaming": ["gaming", "gamer", "esports", "energy drink", "gfuel"],
-            "electronics": ["electronics", "tech", "gadget", "device", "smartphone"],
-            "home": ["home", "furniture", "decor", "kitchen", "living"],
-            "jewelry": ["jewelry", "watch", "ring", "necklace", "bracelet"],
-            "sports": ["sports", "athletic", "outdoor", "running", "basketball"],
-            "food": ["food", "snack", "drink", "beverage", "organic"],
-            "pet": ["pet", "dog", "cat", "animal", "puppy"]
-        }
-        
-        for category, keywords in categories.items():
-            if any(keyword in text_lower for keyword in keywords):
-                return category
-        
-        return "ecommerce"
+        # One scan finds every category with a keyword in the text; the
+        # earliest category in BRAND_CATEGORIES wins, as before
+        found = {match.lastgroup for match in _CATEGORY_RE.finditer(text_content.lower())}
+        return next((category for category in BRAND_CATEGORIES if category in found), "ecommerce")
     
-    def _search_web(self, brand_name: str, category: str, website_url: str) -> List[Dict[str, str]]:
+    async def _search_queries(self, queries: Sequence[str], website_url: str, label: str,
+                              searches: Dict[str, asyncio.Task]) -> AsyncIterator[List[Dict[str, str]]]:
+        """Run every distinct query concurrently, yielding each query's competitors as it finishes.
+        
+        searches maps each query already started during this analysis to its task,
+        so repeated queries reuse the first search instead of sending another.
+        """
+        pending = {}
+        for query in dict.fromkeys(queries):
+            if query not in searches:
+                searches[query] = asyncio.ensure_future(self._perform_web_search(query, website_url))
+            pending[searches[query]] = query
+        
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                query = pending.pop(task)
+                if task.cancelled():
+                    continue
+                if task.exception() is not None:
+                    logger.warning(f"{label} failed for query '{query}': {task.exception()}")
+                    continue
+                yield task.result()
+    
+    async def _search_web(self, brand_name: str, category: str, website_url: str,
+                          searches: Dict[str, asyncio.Task]) -> AsyncIterator[List[Dict[str, str]]]:
         """Search for competitors using web search with multiple queries."""
-        competitors = []
-        
-        # Generate comprehensive search queries
-        search_queries = [
-            f"{category} brands like {brand_name}",
-            f"best {category} websites",
-            f"{category} alternatives to {brand_name}",
-            f"top {category} stores online",
-            f"{brand_name} competitors",
-            f"{category} ecommerce sites",
-            f"similar to {brand_name}",
-            f"{category} online shopping",
-            f"best {category} brands 2024",
-            f"{category} marketplace stores"
-        ]
-        
-        for query in search_queries:
-            try:
-                logger.info(f"Searching for: {query}")
-                found_competitors = self._perform_web_search(query, website_url)
-                competitors.extend(found_competitors)
-                time.sleep(random.uniform(0.5, 1))  # Random delay to avoid rate limiting
-                
-                if len(competitors) >= 20:  # Collect enough candidates
-                    break
-                    
-            except Exception as e:
-                logger.warning(f"Search failed for query '{query}': {e}")
-                continue
+        search_queries = _format_queries(_WEB_QUERY_TEMPLATES, brand_name, category)
         
-        return competitors
+        logger.info(f"Searching for {len(search_queries)} queries")
+        async for competitors in self._search_queries(search_queries, website_url, "Search", searches):
+            yield competitors
     
-    def _search_similar_sites(self, brand_name: str, website_url: str) -> List[Dict[str, str]]:
+    async def _search_similar_sites(self, brand_name: str, website_url: str,
+                                    searches: Dict[str, asyncio.Task]) -> AsyncIterator[List[Dict[str, str]]]:
         """Search for similar sites using alternative approaches."""
-        competitors = []
-        
         try:
             # Extract domain for similar site searches
             domain = urlparse(website_url).netloc
             
             # Search for "sites like" queries
-            similar_queries = [
-                f"sites like {domain}",
-                f"websites similar to {domain}",
-                f"alternatives to {domain}",
-                f"{brand_name} similar websites"
-            ]
+            similar_queries = _format_queries(_SIMILAR_QUERY_TEMPLATES, brand_name, domain=domain)
+            
+            async for competitors in self._search_queries(
+                similar_queries, website_url, "Similar sites search", searches
+            ):
+                yield competitors
             
-            for query in similar_queries:
-                found_competitors = self._perform_web_search(query, website_url)
-                competitors.extend(found_competitors)
-                time.sleep(random.uniform(0.5, 1))
-                
         except Exception as e:
             logger.warning(f"Similar sites search failed: {e}")
-        
-        return competitors
     
-    def _search_industry_specific(self, category: str, brand_name: str, website_url: str) -> List[Dict[str, str]]:
+    async def _search_industry_specific(self, category: str, brand_name: str, website_url: str,
+                                        searches: Dict[str, asyncio.Task]) -> AsyncIterator[List[Dict[str, str]]]:
         """Search for competitors using industry-specific terms."""
-        competitors = []
-        
-        # Industry-specific competitor databases and directories
-        industry_queries = {
-            "gaming": [
-                "gaming supplement brands",
-                "esports energy drinks",
-                "gamer nutrition companies",
-                "gaming lifestyle brands"
-            ],
-            "fashion": [
-                "fashion ecommerce brands",
-                "clothing online stores",
-                "fashion retailers",
-                "apparel brands"
-            ],
-            "beauty": [
-                "beauty ecommerce sites",
-                "cosmetics brands online",
-                "skincare companies",
-                "makeup retailers"
-            ],
-            "fitness": [
-                "fitness supplement brands",
-                "workout nutrition companies",
-                "fitness apparel stores",
-                "health supplement retailers"
-            ],
-            "default": [
-                f"{category} online brands",
-                f"{category} ecommerce companies",
-                f"{category} retail stores",
-                f"{category} direct to consumer brands"
-            ]
-        }
-        
-        queries = industry_queries.get(category, industry_queries["default"])
-        
-        for query in queries:
-            try:
-                found_competitors = self._perform_web_search(query, website_url)
-                competitors.extend(found_competitors)
-                time.sleep(random.uniform(0.5, 1))
-                
-            except Exception as e:
-                logger.warning(f"Industry search failed for '{query}': {e}")
-                continue
-        
-        return competitors
+        templates = _INDUSTRY_QUERY_TEMPLATES.get(category, _INDUSTRY_QUERY_TEMPLATES["default"])
+        queries = _format_queries(templates, brand_name, category)
+        async for competitors in self._search_queries(queries, website_url, "Industry search", searches):
+            yield competitors
     
     def _get_fallback_competitors(self, category: str, original_url: str) -> List[Dict[str, str]]:
         """Get fallback competitors from known popular Shopify stores by category."""
-        fallback_stores = {
-            "gaming": [
-                {"name": "Razer", "url": "https://www.razer.com"},
-                {"name": "SteelSeries", "url": "https://steelseries.com"},
-                {"name": "HyperX", "url": "https://www.hyperxgaming.com"},
-                {"name": "Corsair", "url": "https://www.corsair.com"}
-            ],
-            "fashion": [
-                {"name": "Allbirds", "url": "https://www.allbirds.com"},
-                {"name": "Everlane", "url": "https://www.everlane.com"},
-                {"name": "Bombas", "url": "https://bombas.com"},
-                {"name": "Outdoor Voices", "url": "https://outdoorvoices.com"}
-            ],
-            "beauty": [
-                {"name": "Glossier", "url": "https://www.glossier.com"},
-                {"name": "ColourPop", "url": "https://colourpop.com"},
-                {"name": "Fenty Beauty", "url": "https://fentybeauty.com"},
-                {"name": "Kylie Cosmetics", "url": "https://kyliecosmetics.com"}
-            ],
-            "fitness": [
-                {"name": "Gymshark", "url": "https://www.gymshark.com"},
-                {"name": "Lululemon", "url": "https://shop.lululemon.com"},
-                {"name": "Alo Yoga", "url": "https://www.aloyoga.com"},
-                {"name": "Athletic Greens", "url": "https://athleticgreens.com"}
-            ],
-            "default": [
-                {"name": "Allbirds", "url": "https://www.allbirds.com"},
-                {"name": "ColourPop", "url": "https://colourpop.com"},
-                {"name": "Gymshark", "url": "https://www.gymshark.com"},
-                {"name": "Bombas", "url": "https://bombas.com"}
-            ]
-        }
-        
-        stores = fallback_stores.get(category, fallback_stores["default"])
-        competitors = []
-        
-        for store in stores:
-            if self._is_valid_competitor_url(store["url"], original_url):
-                competitors.append({
-                    'name': store["name"],
-                    'url': store["url"],
-                    'source': 'fallback'
-                })
-        
-        return competitors
+        stores = _FALLBACK_STORES.get(category, _FALLBACK_STORES["default"])
+        return [
+            {'name': name, 'url': url, 'source': 'fallback'}
+            for name, url in stores
+            if self._is_valid_competitor_url(url, original_url)
+        ]
     
-    def _perform_web_search(self, query: str, original_url: str) -> List[Dict[str, str]]:
+    async def _perform_web_search(self, query: str, original_url: str) -> List[Dict[str, str]]:
         """Perform actual web search and extract competitor URLs."""
         competitors = []
         
@@ -296,18 +495,24 @@ class CompetitorAnalyzer:
             
             for search_method in search_methods:
                 try:
-                    results = search_method(query)
+                    results = await search_method(query)
+                    # One candidate per host, so each store is verified once
+                    by_host: Dict[str, str] = {}
                     for url in results:
                         if self._is_valid_competitor_url(url, original_url):
-                            # Check if it's a Shopify store
-                            if self._is_shopify_store(url):
-                                competitor_name = self._extract_brand_name_from_url(url)
-                                competitors.append({
-                                    'name': competitor_name,
-                                    'url': url,
-                                    'source': f'search_{search_method.__name__}'
-                                })
-                                logger.info(f"Found Shopify competitor: {competitor_name} ({url})")
+                            by_host.setdefault(urlparse(url).netloc.lower(), url)
+                    candidates = list(by_host.values())
+                    # Check every candidate for Shopify at once instead of one by one
+                    checks = await asyncio.gather(*(self._is_shopify_store(url) for url in candidates))
+                    for url, is_shopify in zip(candidates, checks):
+                        if is_shopify:
+                            competitor_name = self._extract_brand_name_from_url(url)
+                            competitors.append({
+                                'name': competitor_name,
+                                'url': url,
+                                'source': f'search_{search_method.__name__}'
+                            })
+                            logger.info(f"Found Shopify competitor: {competitor_name} ({url})")
                     
                     if competitors:  # If we found some, don't try other engines
                         break
@@ -321,26 +526,22 @@ class CompetitorAnalyzer:
         
         return competitors
     
-    def _search_duckduckgo(self, query: str) -> List[str]:
+    async def _search_duckduckgo(self, query: str) -> List[str]:
         """Search using DuckDuckGo."""
         urls = []
         try:
             search_url = f"https://duckduckgo.com/html/?q={quote_plus(query)}"
-            response = self.session.get(search_url, timeout=1)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            content, _ = await self._fetch(search_url, paced=True)
             
             # Extract search result links
-            for link in soup.find_all('a', class_='result__a')[:15]:
-                href = link.get('href')  # type: ignore
-                if href and isinstance(href, str) and href.startswith('http'):
-                    urls.append(href)
-                    
+            urls = _result_links(content, _DDG_RESULT_TAG_RE, _DDG_RESULT_STRAINER, 'result__a')
+            
         except Exception as e:
             logger.warning(f"DuckDuckGo search failed: {e}")
         
         return urls
     
-    def _search_bing(self, query: str) -> List[str]:
+    async def _search_bing(self, query: str) -> List[str]:
         """Search using Bing."""
         urls = []
         try:
@@ -348,8 +549,8 @@ class CompetitorAnalyzer:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
-            response = requests.get(search_url, headers=headers, timeout=1)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            content, _ = await self._fetch(search_url, headers=headers, paced=True)
+            soup = parse_html(content, parse_only=_LINK_STRAINER)
             
             # Extract Bing search results
             for link in soup.find_all('a', href=True)[:20]:
@@ -362,45 +563,47 @@ class CompetitorAnalyzer:
         
         return urls
     
-    def _search_startpage(self, query: str) -> List[str]:
+    async def _search_startpage(self, query: str) -> List[str]:
         """Search using Startpage."""
         urls = []
         try:
             search_url = f"https://www.startpage.com/sp/search?query={quote_plus(query)}"
-            response = self.session.get(search_url, timeout=1)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            content, _ = await self._fetch(search_url, paced=True)
             
             # Extract Startpage search results
-            for link in soup.find_all('a', class_='w-gl__result-title')[:15]:
-                href = link.get('href')  # type: ignore
-                if href and isinstance(href, str) and href.startswith('http'):
-                    urls.append(href)
-                    
+            urls = _result_links(
+                content, _STARTPAGE_RESULT_TAG_RE, _STARTPAGE_RESULT_STRAINER, 'w-gl__result-title'
+            )
+            
         except Exception as e:
             logger.warning(f"Startpage search failed: {e}")
         
         return urls
     
-    def _deduplicate_and_validate_competitors(self, competitors: List[Dict[str, str]], original_url: str) -> List[Dict[str, str]]:
-        """Remove duplicates and validate competitors."""
-        seen_urls = set()
-        seen_names = set()
+    def _deduplicate_and_validate_competitors(self, competitors: List[Dict[str, str]], original_url: str,
+                                              seen_domains: Optional[set] = None) -> List[Dict[str, str]]:
+        """Remove duplicates and validate competitors.
+        
+        Domains are recorded in seen_domains, if given, so successive batches
+        are deduplicated against each other too.
+        """
+        # One entry per registrable domain, so www.store.com and store.com collapse
+        if seen_domains is None:
+            seen_domains = set()
         unique_competitors = []
         
         for competitor in competitors:
-            url = competitor.get('url', '').lower()
-            name = competitor.get('name', '').lower()
+            url = competitor.get('url', '')
             
-            # Skip if we've seen this URL or name
-            if url in seen_urls or name in seen_names:
-                continue
-                
             # Skip if not valid
-            if not self._is_valid_competitor_url(competitor.get('url', ''), original_url):
+            if not self._is_valid_competitor_url(url, original_url):
+                continue
+            
+            domain = _registrable_domain(urlparse(url).netloc)
+            if domain in seen_domains:
                 continue
-                
-            seen_urls.add(url)
-            seen_names.add(name)
+            
+            seen_domains.add(domain)
             unique_competitors.append(competitor)
         
         return unique_competitors
@@ -408,23 +611,15 @@ class CompetitorAnalyzer:
     def _is_valid_competitor_url(self, url: str, original_url: str) -> bool:
         """Check if URL is a valid competitor (not the original site)."""
         try:
-            parsed_original = urlparse(original_url)
             parsed_url = urlparse(url)
             
             # Skip if same domain
-            if parsed_original.netloc == parsed_url.netloc:
+            if _original_netloc(original_url) == parsed_url.netloc:
                 return False
             
             # Skip non-commercial domains
-            excluded_domains = [
-                'google.com', 'facebook.com', 'instagram.com', 'twitter.com',
-                'youtube.com', 'wikipedia.org', 'amazon.com', 'ebay.com',
-                'linkedin.com', 'reddit.com', 'pinterest.com'
-            ]
-            
-            for excluded in excluded_domains:
-                if excluded in parsed_url.netloc:
-                    return False
+            if _registrable_domain(parsed_url.netloc).split('.', 1)[0] in self.EXCLUDED_NAMES:
+                return False
             
             # Must be HTTPS and have valid TLD
             if not url.startswith('http'):
@@ -435,30 +630,41 @@ class CompetitorAnalyzer:
         except Exception:
             return False
     
-    def _is_shopify_store(self, url: str) -> bool:
-        """Check if a website is powered by Shopify."""
+    async def _is_shopify_store(self, url: str) -> bool:
+        """Check if a website is powered by Shopify, once per host."""
+        netloc = urlparse(url).netloc.lower()
+        cached = self._shopify_cache.get(netloc)
+        if cached is not None:
+            return cached
+        
+        task = self._shopify_checks.get(netloc)
+        if task is None:
+            task = asyncio.ensure_future(self._check_shopify_store(url))
+            self._shopify_checks[netloc] = task
+            task.add_done_callback(lambda _: self._shopify_checks.pop(netloc, None))
+        # Shielded so one cancelled caller does not cancel the shared check
+        result = await asyncio.shield(task)
+        if result is None:
+            return False
+        self._shopify_cache[netloc] = result
+        return result
+    
+    async def _check_shopify_store(self, url: str) -> Optional[bool]:
+        """Fetch url and look for Shopify markers; None if it could not be checked."""
         try:
-            response = requests.get(url, timeout=1)
-            content = response.text.lower()
-            
-            # Check for Shopify indicators
-            shopify_indicators = [
-                'shopify',
-                'cdn.shopify.com',
-                'myshopify.com',
-                'shopify-analytics',
-                'shopify_stats',
-                'shop_id',
-                'shopify.theme',
-                'shopifycdn.com'
-            ]
+            # Shopify's own response headers answer the question without a body
+            _, headers = await self._fetch(url, method='HEAD')
+            if 'x-shopify-stage' in headers or 'x-shopid' in headers:
+                return True
             
-            for indicator in shopify_indicators:
-                if indicator in content:
-                    return True
+            # Otherwise scan only the start of the page; servers that ignore
+            # the Range header are cut off after the same number of bytes
+            range_headers = {**self.headers, 'Range': f'bytes=0-{SHOPIFY_PROBE_BYTES - 1}'}
+            body, headers = await self._fetch(url, headers=range_headers, max_bytes=SHOPIFY_PROBE_BYTES)
+            if _SHOPIFY_MARKER_RE.search(body):
+                return True
             
             # Check response headers
-            headers = response.headers
             if 'x-shopify-stage' in headers or 'x-shopid' in headers:
                 return True
             
@@ -466,7 +672,7 @@ class CompetitorAnalyzer:
             
         except Exception as e:
             logger.warning(f"Could not verify Shopify for {url}: {e}")
-            return False
+            return None
     
     def _extract_brand_name_from_url(self, url: str) -> str:
         """Extract brand name from URL."""
@@ -475,13 +681,14 @@ class CompetitorAnalyzer:
             domain = parsed.netloc.replace('www.', '')
             
             # Remove TLD
-            name = domain.split('.')[0]
+            name = domain.partition('.')[0]
             
-            # Clean up the name
-            name = re.sub(r'[^a-zA-Z0-9]', ' ', name)
-            name = ' '.join(word.capitalize() for word in name.split())
+            # Most domains are plain alphanumerics and need no cleanup
+            if name.isascii() and name.isalnum():
+                return name.capitalize()
             
-            return name
+            # Clean up the name
+            return ' '.join(word.capitalize() for word in _NON_ALNUM_RE.sub(' ', name).split())
             
         except Exception:
             return url
@@ -502,37 +709,45 @@ class CompetitorAnalyzer:
         
         return unique_competitors
 
-    async def analyze_competitors(self, brand_name: str, website_url: str, insights_service) -> Dict[str, Any]:
-        """Find competitors and extract insights from their Shopify stores."""
+    async def analyze_competitors(self, brand_name: str, website_url: str, insights_service,
+                                  base_insights: Optional[BrandInsights] = None,
+                                  concurrency: int = 8) -> Dict[str, Any]:
+        """Find competitors and extract insights from their Shopify stores.
+        
+        Pass base_insights when the brand's own insights were already fetched, so its
+        homepage is not downloaded again just to detect the category. Up to
+        `concurrency` competitor stores are scraped at the same time; per-host
+        pacing is handled by the scraper's rate limiter.
+        """
         logger.info(f"Starting competitor analysis for {brand_name}")
         
         # Find competitors
-        competitors = self.find_competitors(brand_name, website_url)
+        competitors = await self.find_competitors(brand_name, website_url, base_insights=base_insights)
         logger.info(f"Found {len(competitors)} potential competitors")
         
-        competitor_insights = []
+        # Scrape competitor stores in parallel, at most `concurrency` at a time
+        semaphore = asyncio.Semaphore(max(1, concurrency))
         
-        for competitor in competitors:
-            try:
-                logger.info(f"Analyzing competitor: {competitor['name']} ({competitor['url']})")
-                
-                # Extract insights from competitor's store
-                insights = await insights_service.fetch_insights(competitor['url'])
-                
-                competitor_data = {
-                    'competitor_name': competitor['name'],
-                    'competitor_url': competitor['url'],
-                    'insights': insights.model_dump()
-                }
-                
-                competitor_insights.append(competitor_data)
-                
-                # Rate limiting between competitor analysis
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Failed to analyze competitor {competitor['name']}: {e}")
-                continue
+        async def analyze_one(competitor: Dict[str, str]) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    logger.info(f"Analyzing competitor: {competitor['name']} ({competitor['url']})")
+                    
+                    # Extract insights from competitor's store
+                    insights = await insights_service.fetch_insights(competitor['url'])
+                    
+                    return {
+                        'competitor_name': competitor['name'],
+                        'competitor_url': competitor['url'],
+                        'insights': insights.model_dump(mode='json')
+                    }
+                    
+                except Exception as e:
+                    logger.error(f"Failed to analyze competitor {competitor['name']}: {e}")
+                    return None
+        
+        results = await asyncio.gather(*(analyze_one(c) for c in competitors))
+        competitor_insights = [result for result in results if result is not None]
         
         analysis_result = {
             'original_brand': brand_name,
@@ -560,41 +775,26 @@ class CompetitorAnalyzer:
         }
         
         total_products = 0
-        all_social_platforms = []
-        all_payment_methods = []
-        all_faq_categories = []
+        social_platforms = Counter()
+        payment_methods = Counter()
+        faq_categories = Counter()
         
         for comp in competitor_insights:
             insights = comp.get('insights', {})
             
             # Count products
-            products = insights.get('product_catalog', [])
-            total_products += len(products)
-            
-            # Collect social platforms
-            social_handles = insights.get('social_handles', {})
-            for platform, handle in social_handles.items():
-                if handle:
-                    all_social_platforms.append(platform)
-            
-            # Collect payment methods
-            payment_methods = insights.get('payment_methods', [])
-            all_payment_methods.extend(payment_methods)
-            
-            # Collect FAQ categories
-            faqs = insights.get('faqs', [])
-            for faq in faqs:
-                category = faq.get('category', 'General')
-                all_faq_categories.append(category)
-        
-        # Calculate averages and frequencies
-        if competitor_insights:
-            summary['avg_products_per_store'] = total_products // len(competitor_insights)
-        
-        # Count frequencies
-        from collections import Counter
-        summary['common_social_platforms'] = dict(Counter(all_social_platforms).most_common(5))
-        summary['common_payment_methods'] = dict(Counter(all_payment_methods).most_common(5))
-        summary['common_faq_categories'] = dict(Counter(all_faq_categories).most_common(5))
+            total_products += len(insights.get('product_catalog', []))
+            
+            # Count social platforms, payment methods and FAQ categories
+            social_platforms.update(
+                platform for platform, handle in insights.get('social_handles', {}).items() if handle
+            )
+            payment_methods.update(insights.get('payment_methods', []))
+            faq_categories.update(faq.get('category', 'General') for faq in insights.get('faqs', []))
+        
+        summary['avg_products_per_store'] = total_products // len(competitor_insights)
+        summary['common_social_platforms'] = dict(social_platforms.most_common(5))
+        summary['common_payment_methods'] = dict(payment_methods.most_common(5))
+        summary['common_faq_categories'] = dict(faq_categories.most_common(5))
         
         return summary
@@ -1,16 +1,102 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, NamedTuple, Optional, Dict, Any, Union
 from bs4 import BeautifulSoup, Tag
 from bs4.element import NavigableString
-import json
+import orjson
 import re
 import logging
+import weakref
+from functools import lru_cache
+import soupsieve
 from urllib.parse import urljoin, urlparse
 from core.models import ProductModel, SocialHandles, ContactDetails, PolicyModel, FAQModel, ImportantLinks
 from core.utils import WebScraper, ShopifyDetector, URLUtils, TextCleaner
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax wheels are not published for every platform
+    LexborHTMLParser = None
+
 logger = logging.getLogger(__name__)
 
+class LinkInfo(NamedTuple):
+    """An anchor with its href and text, lowercased once for keyword tests"""
+    element: Tag
+    href: str
+    href_lower: str
+    text_lower: str
+
+# Anchors per soup, collected in one walk and shared by every link extractor
+# run over the same page. Keyed by id() like the JSON-LD cache in
+# base_extractor; entries are dropped when the soup is garbage collected.
+_link_index_cache: Dict[int, List[LinkInfo]] = {}
+
+# Social platform by the registrable domain of a link
+_SOCIAL_HOSTS = {
+    'instagram.com': 'instagram',
+    'facebook.com': 'facebook',
+    'twitter.com': 'twitter',
+    'x.com': 'twitter',
+    'tiktok.com': 'tiktok',
+    'youtube.com': 'youtube',
+    'linkedin.com': 'linkedin',
+    'pinterest.com': 'pinterest'
+}
+
+# Payment method by the indicator found in lowercased page text or icon names
+_PAYMENT_INDICATORS = {
+    'visa': 'Visa',
+    'mastercard': 'Mastercard',
+    'amex': 'American Express',
+    'paypal': 'PayPal',
+    'stripe': 'Stripe',
+    'apple pay': 'Apple Pay',
+    'google pay': 'Google Pay',
+    'shopify pay': 'Shopify Pay',
+    'klarna': 'Klarna',
+    'afterpay': 'Afterpay',
+    'cod': 'Cash on Delivery',
+    'cash on delivery': 'Cash on Delivery'
+}
+# Zero-width, so indicators that overlap in the text are all found in one scan
+_PAYMENT_RE = re.compile(
+    '(?=(' + '|'.join(map(re.escape, _PAYMENT_INDICATORS)) + '))'
+)
+
+# Icons whose file name suggests a payment method
+_PAYMENT_IMG_RE = re.compile(r'(visa|mastercard|paypal|stripe|payment)', re.IGNORECASE)
+
+# Store suffixes stripped from the <title> to get the brand name
+_TITLE_SUFFIX_RE = re.compile(r'\s*[-–|]\s*(Shop|Store|Online|Official).*$', re.IGNORECASE)
+
+# Patterns used by the contact, currency and social extractors
+_CONTACT_ACTION_RE = re.compile(r'contact', re.IGNORECASE)
+_CURRENCY_CLASS_RE = re.compile(r'currency', re.IGNORECASE)
+_CURRENCY_CODE_RE = re.compile(r'\b([A-Z]{3})\b')
+_QUERY_STRING_RE = re.compile(r'\?.*$')
+
+# Availability phrases in a product card's text
+_OUT_OF_STOCK_RE = re.compile(r'sold out|out of stock|unavailable', re.IGNORECASE)
+
+# Policy links by the keywords in their href or text, in priority order
+_POLICY_LINK_PATTERNS = (
+    ('privacy_policy', 'Privacy Policy', re.compile(r'privacy')),
+    ('return_policy', 'Return Policy', re.compile(r'return')),
+    ('refund_policy', 'Refund Policy', re.compile(r'refund')),
+    ('terms_of_service', 'Terms of Service', re.compile(r'terms|tos'))
+)
+
+# Important links by the keywords in their href or text, in priority order
+_IMPORTANT_LINK_PATTERNS = (
+    ('order_tracking', re.compile(r'track|order-status')),
+    ('contact_us', re.compile(r'contact|get-in-touch')),
+    ('blogs', re.compile(r'blog|news|articles')),
+    ('about_us', re.compile(r'about|our-story')),
+    ('shipping_info', re.compile(r'shipping|delivery')),
+    ('size_guide', re.compile(r'size|sizing|fit-guide')),
+    ('careers', re.compile(r'career|jobs|join-us'))
+)
+
 def safe_get_attr(element, attr: str, default: str = '') -> str:
     """Safely get attribute from BeautifulSoup element"""
     if hasattr(element, 'get'):
@@ -30,18 +116,60 @@ def safe_find_all(element, *args, **kwargs):
         return element.find_all(*args, **kwargs)
     return []
 
+@lru_cache(maxsize=256)
+def compile_selector(selector: str) -> soupsieve.SoupSieve:
+    """Compile a CSS selector once; soup.select() would re-parse it on every call"""
+    return soupsieve.compile(selector)
+
 class BaseExtractor(ABC):
     """Abstract base class for data extractors"""
     
-    def __init__(self, soup: BeautifulSoup, base_url: str):
+    def __init__(self, soup: BeautifulSoup, base_url: str, html: Optional[Union[str, bytes]] = None):
         self.soup = soup
         self.base_url = base_url
+        # Raw page, when available, lets script lookups use the C parser
+        self.html = html
         self.domain = URLUtils.get_domain(base_url)
     
     @abstractmethod
     def extract(self) -> Any:
         """Extract specific data from the soup"""
         pass
+    
+    def _links(self) -> List[LinkInfo]:
+        """Every anchor with an href on the page, collected once per soup"""
+        key = id(self.soup)
+        links = _link_index_cache.get(key)
+        if links is not None:
+            return links
+        
+        links = []
+        for link in self.soup.find_all('a', href=True):
+            href = safe_get_attr(link, 'href')
+            if href:
+                links.append(LinkInfo(link, href, href.lower(), safe_get_text(link, strip=True).lower()))
+        
+        _link_index_cache[key] = links
+        weakref.finalize(self.soup, _link_index_cache.pop, key, None)
+        return links
+    
+    def _json_ld_texts(self) -> Iterator[str]:
+        """Text of every JSON-LD script on the page"""
+        if self.html and LexborHTMLParser is not None:
+            # Lexbor matches the scripts in C without building a Tag per node
+            for node in LexborHTMLParser(self.html).css('script[type="application/ld+json"]'):
+                yield node.text()
+        else:
+            for script in self.soup.find_all('script', type='application/ld+json'):
+                yield script.string or script.get_text()
+    
+    def _select(self, selector: str, element=None) -> List[Tag]:
+        """All matches of a CSS selector in element (the page by default)"""
+        return compile_selector(selector).select(self.soup if element is None else element)
+    
+    def _select_one(self, selector: str, element=None) -> Optional[Tag]:
+        """First match of a CSS selector in element (the page by default)"""
+        return compile_selector(selector).select_one(self.soup if element is None else element)
 
 class ProductExtractor(BaseExtractor):
     """Extract product information from Shopify pages"""
@@ -62,7 +190,7 @@ class ProductExtractor(BaseExtractor):
         ]
         
         for selector in product_selectors:
-            product_elements = self.soup.select(selector)
+            product_elements = self._select(selector)
             if product_elements:
                 for element in product_elements:
                     product = self._extract_single_product(element)
@@ -134,8 +262,7 @@ class ProductExtractor(BaseExtractor):
             
             # Extract availability
             availability = "In Stock"  # Default
-            availability_indicators = element.find_all(text=re.compile(r'(sold out|out of stock|unavailable)', re.I))
-            if availability_indicators:
+            if _OUT_OF_STOCK_RE.search(element.get_text(' ')):
                 availability = "Out of Stock"
             
             return ProductModel(
@@ -154,11 +281,10 @@ class ProductExtractor(BaseExtractor):
     def _extract_from_json_ld(self) -> List[ProductModel]:
         """Extract products from JSON-LD structured data"""
         products = []
-        scripts = self.soup.find_all('script', type='application/ld+json')
         
-        for script in scripts:
+        for script_text in self._json_ld_texts():
             try:
-                data = json.loads(script.get_text())
+                data = orjson.loads(script_text)
                 if isinstance(data, list):
                     for item in data:
                         product = self._parse_json_ld_product(item)
@@ -168,7 +294,7 @@ class ProductExtractor(BaseExtractor):
                     product = self._parse_json_ld_product(data)
                     if product:
                         products.append(product)
-            except (json.JSONDecodeError, Exception) as e:
+            except (orjson.JSONDecodeError, Exception) as e:
                 logger.debug(f"Error parsing JSON-LD: {str(e)}")
                 continue
         
@@ -237,7 +363,7 @@ class ProductExtractor(BaseExtractor):
     def _find_text_by_selectors(self, element, selectors: List[str]) -> Optional[str]:
         """Find text using multiple CSS selectors"""
         for selector in selectors:
-            found = element.select_one(selector)
+            found = self._select_one(selector, element)
             if found:
                 text = found.get_text(strip=True)
                 if text:
@@ -245,13 +371,16 @@ class ProductExtractor(BaseExtractor):
         return None
     
     def _deduplicate_products(self, products: List[ProductModel]) -> List[ProductModel]:
-        """Remove duplicate products based on name"""
-        seen_names = set()
+        """Remove duplicate products based on their normalized name"""
+        seen_fingerprints = set()
         unique_products = []
         
         for product in products:
-            if product.name not in seen_names:
-                seen_names.add(product.name)
+            fingerprint = TextCleaner.product_fingerprint(product.name, product.product_url)
+            if fingerprint is None:
+                unique_products.append(product)
+            elif fingerprint not in seen_fingerprints:
+                seen_fingerprints.add(fingerprint)
                 unique_products.append(product)
         
         return unique_products
@@ -262,38 +391,25 @@ class SocialMediaExtractor(BaseExtractor):
     def extract(self) -> SocialHandles:
         """Extract social media links"""
         social_handles = SocialHandles()
-        
-        # Find all links
-        links = self.soup.find_all('a', href=True)
-        
-        for link in links:
-            href_attr = safe_get_attr(link, 'href')
-            if not href_attr:
-                continue
-                
-            href = href_attr.lower()
-            
-            if 'instagram.com' in href:
-                social_handles.instagram = self._clean_social_url(href_attr)
-            elif 'facebook.com' in href:
-                social_handles.facebook = self._clean_social_url(href_attr)
-            elif 'twitter.com' in href or 'x.com' in href:
-                social_handles.twitter = self._clean_social_url(href_attr)
-            elif 'tiktok.com' in href:
-                social_handles.tiktok = self._clean_social_url(href_attr)
-            elif 'youtube.com' in href:
-                social_handles.youtube = self._clean_social_url(href_attr)
-            elif 'linkedin.com' in href:
-                social_handles.linkedin = self._clean_social_url(href_attr)
-            elif 'pinterest.com' in href:
-                social_handles.pinterest = self._clean_social_url(href_attr)
+        remaining = set(_SOCIAL_HOSTS.values())
+        
+        for link in self._links():
+            # Absolute and protocol-relative links only; the host's last two
+            # labels pick the platform, so www., m. and country subdomains match
+            host = link.href_lower.partition('//')[2].split('/', 1)[0].split('?', 1)[0]
+            platform = _SOCIAL_HOSTS.get('.'.join(host.rsplit('.', 2)[-2:]))
+            if platform in remaining:
+                setattr(social_handles, platform, self._clean_social_url(link.href))
+                remaining.discard(platform)
+                if not remaining:
+                    break
         
         return social_handles
     
     def _clean_social_url(self, url: str) -> str:
         """Clean and normalize social media URL"""
         # Remove tracking parameters
-        url = re.sub(r'\?.*$', '', url)
+        url = _QUERY_STRING_RE.sub('', url)
         return url.strip()
 
 class ContactExtractor(BaseExtractor):
@@ -306,14 +422,13 @@ class ContactExtractor(BaseExtractor):
         # Get all text content
         text_content = self.soup.get_text()
         
-        # Extract emails
-        contact_details.emails = TextCleaner.extract_emails(text_content)
-        
-        # Extract phone numbers
-        contact_details.phone_numbers = TextCleaner.extract_phone_numbers(text_content)
+        # Extract emails and phone numbers in one scan of the page text
+        contacts = TextCleaner.extract_all(text_content)
+        contact_details.emails = contacts['emails']
+        contact_details.phone_numbers = contacts['phone_numbers']
         
         # Look for contact form
-        contact_form = self.soup.find('form', {'action': re.compile(r'contact', re.I)})
+        contact_form = self.soup.find('form', {'action': _CONTACT_ACTION_RE})
         if contact_form:
             contact_details.contact_form_url = self.base_url
         
@@ -325,7 +440,7 @@ class ContactExtractor(BaseExtractor):
         ]
         
         for selector in address_selectors:
-            element = self.soup.select_one(selector)
+            element = self._select_one(selector)
             if element:
                 address_text = element.get_text(strip=True)
                 if len(address_text) > 20:  # Likely to be a real address
@@ -346,36 +461,14 @@ class PolicyExtractor(BaseExtractor):
             'terms_of_service': None
         }
         
-        # Find all links
-        links = self.soup.find_all('a', href=True)
-        
-        for link in links:
-            href_attr = safe_get_attr(link, 'href')
-            if not href_attr:
-                continue
-                
-            href = href_attr.lower()
-            link_text = safe_get_text(link, strip=True).lower()
-            
-            # Privacy Policy
-            if any(term in href or term in link_text for term in ['privacy', 'privacy-policy']):
-                if not policies['privacy_policy']:
-                    policies['privacy_policy'] = self._extract_policy_content(link, 'Privacy Policy')
-            
-            # Return Policy
-            elif any(term in href or term in link_text for term in ['return', 'returns', 'return-policy']):
-                if not policies['return_policy']:
-                    policies['return_policy'] = self._extract_policy_content(link, 'Return Policy')
-            
-            # Refund Policy
-            elif any(term in href or term in link_text for term in ['refund', 'refunds', 'refund-policy']):
-                if not policies['refund_policy']:
-                    policies['refund_policy'] = self._extract_policy_content(link, 'Refund Policy')
-            
-            # Terms of Service
-            elif any(term in href or term in link_text for term in ['terms', 'tos', 'terms-of-service', 'terms-conditions']):
-                if not policies['terms_of_service']:
-                    policies['terms_of_service'] = self._extract_policy_content(link, 'Terms of Service')
+        for link in self._links():
+            # Keywords never contain a newline, so one search covers href and text
+            haystack = f"{link.href_lower}\n{link.text_lower}"
+            for key, title, pattern in _POLICY_LINK_PATTERNS:
+                if pattern.search(haystack):
+                    if not policies[key]:
+                        policies[key] = self._extract_policy_content(link.element, title)
+                    break
         
         return policies
     
@@ -417,7 +510,7 @@ class FAQExtractor(BaseExtractor):
         ]
         
         for selector in faq_selectors:
-            faq_elements = self.soup.select(selector)
+            faq_elements = self._select(selector)
             if faq_elements:
                 for element in faq_elements:
                     faq = self._extract_single_faq(element)
@@ -490,7 +583,7 @@ class FAQExtractor(BaseExtractor):
     def _find_text_by_selectors(self, element, selectors: List[str]) -> Optional[str]:
         """Find text using multiple CSS selectors"""
         for selector in selectors:
-            found = element.select_one(selector)
+            found = self._select_one(selector, element)
             if found:
                 text = found.get_text(strip=True)
                 if text:
@@ -504,58 +597,24 @@ class ImportantLinksExtractor(BaseExtractor):
         """Extract important links"""
         links = ImportantLinks()
         
-        # Find all links
-        all_links = self.soup.find_all('a', href=True)
-        
-        for link in all_links:
-            href_attr = safe_get_attr(link, 'href')
-            if not href_attr:
-                continue
-                
-            href = href_attr.lower()
-            link_text = safe_get_text(link, strip=True).lower()
-            full_url = URLUtils.normalize_url(href_attr, self.base_url)
-            
-            # Order tracking
-            if any(term in href or term in link_text for term in ['track', 'tracking', 'order-status', 'track-order']):
-                if not links.order_tracking:
-                    links.order_tracking = full_url
-            
-            # Contact us
-            elif any(term in href or term in link_text for term in ['contact', 'contact-us', 'get-in-touch']):
-                if not links.contact_us:
-                    links.contact_us = full_url
-            
-            # Blogs
-            elif any(term in href or term in link_text for term in ['blog', 'blogs', 'news', 'articles']):
-                if not links.blogs:
-                    links.blogs = full_url
-            
-            # About us
-            elif any(term in href or term in link_text for term in ['about', 'about-us', 'our-story']):
-                if not links.about_us:
-                    links.about_us = full_url
-            
-            # Shipping info
-            elif any(term in href or term in link_text for term in ['shipping', 'delivery', 'shipping-info']):
-                if not links.shipping_info:
-                    links.shipping_info = full_url
-            
-            # Size guide
-            elif any(term in href or term in link_text for term in ['size', 'size-guide', 'sizing', 'fit-guide']):
-                if not links.size_guide:
-                    links.size_guide = full_url
-            
-            # Careers
-            elif any(term in href or term in link_text for term in ['career', 'careers', 'jobs', 'join-us']):
-                if not links.careers:
-                    links.careers = full_url
+        for link in self._links():
+            # Keywords never contain a newline, so one search covers href and text
+            haystack = f"{link.href_lower}\n{link.text_lower}"
+            for field, pattern in _IMPORTANT_LINK_PATTERNS:
+                if pattern.search(haystack):
+                    if not getattr(links, field):
+                        setattr(links, field, URLUtils.normalize_url(link.href, self.base_url))
+                    break
         
         return links
 
 class BrandExtractor(BaseExtractor):
     """Extract brand-specific information"""
     
+    def __init__(self, soup: BeautifulSoup, base_url: str, html_content: Optional[Union[str, bytes]] = None):
+        super().__init__(soup, base_url, html_content)
+        self.html_content = html_content
+    
     def extract(self) -> Dict[str, Any]:
         """Extract brand information"""
         brand_info = {
@@ -588,7 +647,7 @@ class BrandExtractor(BaseExtractor):
         if title_tag:
             title_text = safe_get_text(title_tag, strip=True)
             # Remove common suffixes
-            title_text = re.sub(r'\s*[-–|]\s*(Shop|Store|Online|Official).*$', '', title_text, flags=re.IGNORECASE)
+            title_text = _TITLE_SUFFIX_RE.sub('', title_text)
             if title_text and len(title_text) < 100:
                 return TextCleaner.clean_text(title_text)
         
@@ -608,7 +667,7 @@ class BrandExtractor(BaseExtractor):
         ]
         
         for selector in logo_selectors:
-            logo_img = self.soup.select_one(selector)
+            logo_img = self._select_one(selector)
             if logo_img:
                 alt_text = safe_get_attr(logo_img, 'alt')
                 if alt_text and 'logo' not in alt_text.lower():
@@ -645,7 +704,7 @@ class BrandExtractor(BaseExtractor):
         ]
         
         for selector in logo_selectors:
-            logo_img = self.soup.select_one(selector)
+            logo_img = self._select_one(selector)
             if logo_img:
                 logo_url = safe_get_attr(logo_img, 'src') or safe_get_attr(logo_img, 'data-src')
                 if logo_url:
@@ -658,18 +717,18 @@ class BrandExtractor(BaseExtractor):
         currencies = set()
         
         # Look for Shopify currency data
-        shopify_data = ShopifyDetector.extract_shopify_data(self.soup)
+        shopify_data = ShopifyDetector.extract_shopify_data(self.html_content or str(self.soup))
         if shopify_data.get('currency'):
             currencies.add(shopify_data['currency'])
         
         # Look for currency selectors/dropdowns
-        currency_elements = self.soup.find_all(['select', 'div'], class_=re.compile(r'currency', re.I))
+        currency_elements = self.soup.find_all(['select', 'div'], class_=_CURRENCY_CLASS_RE)
         for element in currency_elements:
             options = safe_find_all(element, ['option', 'a', 'span'])
             for option in options:
                 text = safe_get_text(option, strip=True)
                 # Look for currency codes (3 letters)
-                currency_match = re.search(r'\b([A-Z]{3})\b', text)
+                currency_match = _CURRENCY_CODE_RE.search(text)
                 if currency_match:
                     currencies.add(currency_match.group(1))
         
@@ -679,37 +738,17 @@ class BrandExtractor(BaseExtractor):
         """Extract payment methods"""
         payment_methods = set()
         
-        # Common payment method indicators
-        payment_indicators = {
-            'visa': 'Visa',
-            'mastercard': 'Mastercard',
-            'amex': 'American Express',
-            'paypal': 'PayPal',
-            'stripe': 'Stripe',
-            'apple pay': 'Apple Pay',
-            'google pay': 'Google Pay',
-            'shopify pay': 'Shopify Pay',
-            'klarna': 'Klarna',
-            'afterpay': 'Afterpay',
-            'cod': 'Cash on Delivery',
-            'cash on delivery': 'Cash on Delivery'
-        }
-        
-        # Get all text content
-        text_content = self.soup.get_text().lower()
-        
-        for indicator, method in payment_indicators.items():
-            if indicator in text_content:
-                payment_methods.add(method)
+        # One scan of the page text finds every indicator
+        for match in _PAYMENT_RE.finditer(self.soup.get_text().lower()):
+            payment_methods.add(_PAYMENT_INDICATORS[match.group(1)])
         
         # Look for payment icons
-        payment_imgs = self.soup.find_all('img', src=re.compile(r'(visa|mastercard|paypal|stripe|payment)', re.I))
+        payment_imgs = self.soup.find_all('img', src=_PAYMENT_IMG_RE)
         for img in payment_imgs:
             src = safe_get_attr(img, 'src', '').lower()
             alt = safe_get_attr(img, 'alt', '').lower()
             
-            for indicator, method in payment_indicators.items():
-                if indicator in src or indicator in alt:
-                    payment_methods.add(method)
+            for match in _PAYMENT_RE.finditer(f"{src}\n{alt}"):
+                payment_methods.add(_PAYMENT_INDICATORS[match.group(1)])
         
-        return list(payment_methods)
\ No newline at end of file
+        return list(payment_methods)
@@ -2,7 +2,7 @@ import re
 import html
 import requests
 from typing import List, Dict, Optional
-from bs4 import BeautifulSoup
+from core.utils import parse_html
 from .base_extractor import BaseExtractor, safe_get_text, safe_find_all, safe_find
 
 
@@ -115,7 +115,7 @@ class FAQExtractor(BaseExtractor):
             body_html = html.unescape(body_html)
             
             # Parse FAQ content
-            soup = BeautifulSoup(body_html, 'html.parser')
+            soup = parse_html(body_html)
             return self._parse_faq_html(soup)
             
         except Exception:
@@ -128,7 +128,7 @@ class FAQExtractor(BaseExtractor):
             if response.status_code != 200:
                 return None
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = parse_html(response.content)
             
             # Find FAQ content in various containers
             faq_containers = safe_find_all(soup, ['div', 'section'], class_=re.compile(r'faq|question|help', re.I))
@@ -10,7 +10,7 @@ import logging
 import asyncio
 import aiohttp
 from core.models import ProductModel
-from core.utils import WebScraper
+from core.utils import WebScraper, TextCleaner
 from .base_extractor import BaseExtractor, safe_get_attr, safe_get_text, safe_find_all, safe_find
 
 logger = logging.getLogger(__name__)
@@ -752,17 +752,17 @@ class HeroProductExtractor(BaseExtractor):
         return [product for score, product in scored_products]
     
     def _deduplicate_products(self, products: List[ProductModel]) -> List[ProductModel]:
-        """Remove duplicate products based on name and URL"""
-        seen = set()
+        """Remove duplicate products based on their normalized name"""
+        seen_fingerprints = set()
         unique_products = []
         
         for product in products:
-            # Create a unique identifier
-            identifier = (product.name.lower() if product.name else '', 
-                         product.product_url if product.product_url else '')
+            if not product.name:
+                continue
             
-            if identifier not in seen and product.name:
-                seen.add(identifier)
+            fingerprint = TextCleaner.product_fingerprint(product.name, product.product_url)
+            if fingerprint not in seen_fingerprints:
+                seen_fingerprints.add(fingerprint)
                 unique_products.append(product)
         
         return unique_products
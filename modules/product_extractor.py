@@ -2,13 +2,14 @@
 Product extraction module for Shopify stores
 Handles extraction of all products from product pages and product listings
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from bs4 import BeautifulSoup
 import json
 import re
 import logging
 from urllib.parse import urljoin, urlparse
 from core.models import ProductModel
+from core.utils import TextCleaner
 from .base_extractor import BaseExtractor, safe_get_attr, safe_get_text, safe_find_all, safe_find
 
 logger = logging.getLogger(__name__)
@@ -405,17 +406,17 @@ class ProductExtractor(BaseExtractor):
         return tags if tags else None
     
     def _deduplicate_products(self, products: List[ProductModel]) -> List[ProductModel]:
-        """Remove duplicate products based on name and URL"""
-        seen = set()
+        """Remove duplicate products based on their normalized name"""
+        seen_fingerprints = set()
         unique_products = []
         
         for product in products:
-            # Create a unique identifier
-            identifier = (product.name.lower() if product.name else '', 
-                         product.product_url if product.product_url else '')
+            if not product.name:
+                continue
             
-            if identifier not in seen and product.name:
-                seen.add(identifier)
+            fingerprint = TextCleaner.product_fingerprint(product.name, product.product_url)
+            if fingerprint not in seen_fingerprints:
+                seen_fingerprints.add(fingerprint)
                 unique_products.append(product)
         
         return unique_products
@@ -423,8 +424,9 @@ class ProductExtractor(BaseExtractor):
 class ProductCatalogExtractor(ProductExtractor):
     """Specialized extractor for full product catalogs"""
     
-    def __init__(self, soup: BeautifulSoup, base_url: str, max_products: int = 100):
-        super().__init__(soup, base_url)
+    def __init__(self, soup: BeautifulSoup, base_url: str, max_products: int = 100,
+                 html: Optional[Union[str, bytes]] = None):
+        super().__init__(soup, base_url, html)
         self.max_products = max_products
     
     def extract(self) -> List[ProductModel]:
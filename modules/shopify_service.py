@@ -6,7 +6,7 @@ from datetime import datetime
 import validators
 
 from core.models import BrandInsights, ErrorResponse, ProductModel
-from core.utils import WebScraper, ShopifyDetector, URLUtils
+from core.utils import WebScraper, ShopifyDetector, URLUtils, TextCleaner, parse_html
 from modules.product_extractor import ProductExtractor, ProductCatalogExtractor
 from modules.hero_product_extractor import HeroProductExtractor
 from modules.privacy_policy_extractor import PrivacyPolicyExtractor
@@ -15,7 +15,7 @@ from modules.extractors import (
     PolicyExtractor, FAQExtractor, ImportantLinksExtractor, BrandExtractor
 )
 from config.settings import settings
-from database.models import db_manager
+from database import get_db_manager
 
 logger = logging.getLogger(__name__)
 
@@ -61,7 +61,7 @@ class ShopifyInsightsService:
                 raise Exception("Failed to fetch website content")
             
             # Parse HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = parse_html(html_content)
             
             # Verify it's a Shopify store
             if not ShopifyDetector.is_shopify_store(html_content, normalized_url):
@@ -71,35 +71,31 @@ class ShopifyInsightsService:
             # Initialize insights object
             insights = BrandInsights(website_url=normalized_url)
             
-            # Extract basic brand information
-            brand_extractor = BrandExtractor(soup, normalized_url)
-            brand_info = brand_extractor.extract()
+            # The page extractors only read the soup, so they run in worker
+            # threads alongside the hero product fetch instead of one after
+            # another on the event loop
+            logger.info("Extracting brand info, hero products, social handles, contacts, policies, FAQs and links")
+            hero_extractor = HeroProductExtractor(soup, normalized_url, scraper)
+            (brand_info, hero_products, social_handles, contact_details,
+             all_policies, faq_data, important_links) = await asyncio.gather(
+                asyncio.to_thread(BrandExtractor(soup, normalized_url, html_content).extract),
+                hero_extractor.extract_async(),
+                asyncio.to_thread(SocialMediaExtractor(soup, normalized_url).extract),
+                asyncio.to_thread(ContactExtractor(soup, normalized_url).extract),
+                asyncio.to_thread(PrivacyPolicyExtractor(soup, normalized_url).extract),
+                asyncio.to_thread(FAQExtractor(soup, normalized_url).extract),
+                asyncio.to_thread(ImportantLinksExtractor(soup, normalized_url).extract)
+            )
             
             insights.brand_name = brand_info['name']
             insights.brand_description = brand_info['description']
             insights.logo_url = brand_info['logo_url']
             insights.currencies_supported = brand_info['currencies']
             insights.payment_methods = brand_info['payment_methods']
-            
-            # Extract hero products (by loading all products and filtering by tags)
-            logger.info("Extracting hero products by loading all products and filtering by homepage tags")
-            hero_extractor = HeroProductExtractor(soup, normalized_url, scraper)
-            insights.hero_products = await hero_extractor.extract_async()
-            
-            # Extract social media handles
-            logger.info("Extracting social media handles")
-            social_extractor = SocialMediaExtractor(soup, normalized_url)
-            insights.social_handles = social_extractor.extract()
-            
-            # Extract contact details
-            logger.info("Extracting contact details")
-            contact_extractor = ContactExtractor(soup, normalized_url)
-            insights.contact_details = contact_extractor.extract()
-            
-            # Extract policies using the new privacy policy extractor
-            logger.info("Extracting policies")
-            privacy_extractor = PrivacyPolicyExtractor(soup, normalized_url)
-            all_policies = privacy_extractor.extract()
+            insights.hero_products = hero_products
+            insights.social_handles = social_handles
+            insights.contact_details = contact_details
+            insights.important_links = important_links
             
             # Organize policies by type
             for policy in all_policies:
@@ -113,11 +109,6 @@ class ShopifyInsightsService:
                 elif 'terms' in policy_title_lower or 'conditions' in policy_title_lower:
                     insights.terms_of_service = policy
             
-            # Extract FAQs
-            logger.info("Extracting FAQs")
-            faq_extractor = FAQExtractor(soup, normalized_url)
-            faq_data = faq_extractor.extract()
-            
             # Convert FAQ dictionaries to FAQModel objects
             from core.models import FAQModel
             insights.faqs = [
@@ -131,11 +122,6 @@ class ShopifyInsightsService:
             ]
             logger.info(f"Extracted {len(insights.faqs)} FAQs")
             
-            # Extract important links
-            logger.info("Extracting important links")
-            links_extractor = ImportantLinksExtractor(soup, normalized_url)
-            insights.important_links = links_extractor.extract()
-            
             # Fetch complete product catalog
             logger.info("Fetching complete product catalog")
             catalog_products = await self._fetch_product_catalog(scraper, normalized_url, soup)
@@ -146,14 +132,15 @@ class ShopifyInsightsService:
             insights.scraped_at = datetime.now()
             
             # Save insights to database
-            try:
-                logger.info("Saving insights to database")
-                insights_dict = insights.model_dump()
-                store_id = db_manager.save_store_insights(insights_dict)
-                logger.info(f"Successfully saved insights to database with store ID: {store_id}")
-            except Exception as e:
-                logger.error(f"Failed to save insights to database: {e}")
-                # Continue without failing the request
+            if settings.enable_db_storage:
+                try:
+                    logger.info("Saving insights to database")
+                    insights_dict = insights.model_dump()
+                    store_id = await asyncio.to_thread(get_db_manager().save_store_insights, insights_dict)
+                    logger.info(f"Successfully saved insights to database with store ID: {store_id}")
+                except Exception as e:
+                    logger.error(f"Failed to save insights to database: {e}")
+                    # Continue without failing the request
             
             logger.info(f"Successfully extracted insights for {normalized_url}")
             return insights
@@ -293,8 +280,8 @@ class ShopifyInsightsService:
                 try:
                     html_content = await scraper.fetch_page(url)
                     if html_content:
-                        soup = BeautifulSoup(html_content, 'html.parser')
-                        extractor = ProductCatalogExtractor(soup, url, max_products=10)
+                        soup = parse_html(html_content)
+                        extractor = ProductCatalogExtractor(soup, url, max_products=10, html=html_content)
                         return extractor.extract()
                 except Exception as e:
                     logger.error(f"Error fetching product page {url}: {str(e)}")
@@ -333,7 +320,7 @@ class ShopifyInsightsService:
             try:
                 html_content = await scraper.fetch_page(collections_url)
                 if html_content:
-                    soup = BeautifulSoup(html_content, 'html.parser')
+                    soup = parse_html(html_content)
                     
                     # Find product links
                     product_links = soup.find_all('a', href=True)
@@ -394,15 +381,16 @@ class ShopifyInsightsService:
         return url.rstrip('/')
     
     def _deduplicate_products(self, products: List[ProductModel]) -> List[ProductModel]:
-        """Remove duplicate products based on name and URL"""
-        seen = set()
+        """Remove duplicate products based on their normalized name"""
+        seen_fingerprints = set()
         unique_products = []
         
         for product in products:
-            # Create a key based on name and URL
-            key = (product.name, product.product_url)
-            if key not in seen:
-                seen.add(key)
+            fingerprint = TextCleaner.product_fingerprint(product.name, product.product_url)
+            if fingerprint is None:
+                unique_products.append(product)
+            elif fingerprint not in seen_fingerprints:
+                seen_fingerprints.add(fingerprint)
                 unique_products.append(product)
         
         return unique_products